@@ -1,7 +1,10 @@
 import pygame, sys
+import signal
+import itertools
 from pygame.locals import *
 import npuzzle
 import test
+import solution_cache
 from multiprocessing import Process, Queue
 import time
 
@@ -10,6 +13,13 @@ WINDOWWIDTH = 800
 WINDOWHEIGHT = 640
 FPS = 60
 BLANK = None
+CACHE_FILE = 'solutions.db'
+PORTFOLIO_LOG = 'portfolio.jsonl'
+PROGRESS_INTERVAL = 0.25 # seconds between progress events sent by the solver
+SLIDE_SPEED = 10 # pixels per frame when a tile slides
+REPLAY_SECONDS = 5 # long solutions are replayed in about this time by applying several moves per frame
+TEXT_CACHE_LIMIT = 256 # rendered text surfaces kept before the cache is cleared
+SOLVER_TIME_LIMIT = 58 # seconds; solvers stop on their own (npuzzle.SearchLimits) just before the 60-second cutoff
 
 #                 R    G    B
 BLACK =         (  0,   0,   0)
@@ -117,21 +127,54 @@ def get_move_spot(board, x, y):
                 return tile_x, tile_y
     return None, None
 
+# Rendered tiles and texts are cached, so redrawing the board does not render fonts again
+TILE_SURFACES = {}
+TEXT_SURFACES = {}
+
+def get_tile_surface(number):
+    tile_surf = TILE_SURFACES.get(number)
+    if tile_surf is None:
+        tile_surf = pygame.Surface((TILESIZE, TILESIZE))
+        tile_surf.fill(TILECOLOR)
+        text_surf = BASICFONT.render(str(number), True, TEXTCOLOR)
+        text_rect = text_surf.get_rect()
+        text_rect.center = int(TILESIZE / 2), int(TILESIZE / 2)
+        tile_surf.blit(text_surf, text_rect)
+        TILE_SURFACES[number] = tile_surf
+    return tile_surf
+
 def draw_tile(tile_x, tile_y, number, adjx=0, adjy=0):
     left, top = get_left_top_of_tile(tile_x, tile_y)
-    pygame.draw.rect(DISPLAYSURF, TILECOLOR, (left + adjx, top + adjy, TILESIZE, TILESIZE))
-    text_surf = BASICFONT.render(str(number), True, TEXTCOLOR)
-    text_rect = text_surf.get_rect()
-    text_rect.center = left + int(TILESIZE / 2) + adjx, top + int(TILESIZE / 2) + adjy
-    DISPLAYSURF.blit(text_surf, text_rect)
+    DISPLAYSURF.blit(get_tile_surface(number), (left + adjx, top + adjy))
 
 def make_text(text, color, bgcolor, top, left):
     # create the Surface and Rect objects for some text.
-    textSurf = BASICFONT.render(text, True, color, bgcolor)
+    textSurf = TEXT_SURFACES.get((text, color, bgcolor))
+    if textSurf is None:
+        if len(TEXT_SURFACES) >= TEXT_CACHE_LIMIT:
+            TEXT_SURFACES.clear()
+        textSurf = BASICFONT.render(text, True, color, bgcolor)
+        TEXT_SURFACES[(text, color, bgcolor)] = textSurf
     textRect = textSurf.get_rect()
     textRect.topleft = (top, left)
     return (textSurf, textRect)
 
+def draw_cells(board, cells):
+    """Redraws only the given (row, col) cells and returns their rects for pygame.display.update."""
+    rects = []
+    for row, col in cells:
+        left, top = get_left_top_of_tile(col, row)
+        rect = pygame.Rect(left, top, TILESIZE, TILESIZE)
+        DISPLAYSURF.fill(BGCOLOR, rect)
+        if board[row][col]:
+            draw_tile(col, row, board[row][col])
+        rects.append(rect)
+    return rects
+
+def screen_state(board, message, progress_event):
+    # Everything draw_board shows: the screen is fully redrawn only when this changes
+    return (message, TIME_SURF, NODES_SURF, STEP_SURF, TIMER_SURF, REPLAY_SURF, progress_event, tuple(map(tuple, board)))
+
 def draw_board(board, message):
     DISPLAYSURF.fill(BGCOLOR)
 
@@ -154,12 +197,18 @@ def draw_board(board, message):
     DISPLAYSURF.blit(NODES_SURF, NODES_RECT)
     DISPLAYSURF.blit(DFS_SURF, DFS_RECT)
     DISPLAYSURF.blit(IDS_SURF, IDS_RECT)
+    DISPLAYSURF.blit(IDA_SURF, IDA_RECT)
+    DISPLAYSURF.blit(ASTAR_SURF, ASTAR_RECT)
+    DISPLAYSURF.blit(BIDIR_SURF, BIDIR_RECT)
+    DISPLAYSURF.blit(PORTFOLIO_SURF, PORTFOLIO_RECT)
+    DISPLAYSURF.blit(REDUCE_SURF, REDUCE_RECT)
     DISPLAYSURF.blit(TIMER_SURF, TIMER_RECT)
     DISPLAYSURF.blit(RESET_SURF, RESET_RECT)
     DISPLAYSURF.blit(NEWGAME_SURF, NEWGAME_RECT)
     DISPLAYSURF.blit(STEP_SURF, STEP_RECT)
+    DISPLAYSURF.blit(REPLAY_SURF, REPLAY_RECT)
 
-def slide_animation(board, direction, message, animationSpeed):
+def slide_animation(board, direction, animationSpeed):
     # Note: This function does not check if the move is valid.
 
     blankx, blanky = get_blank_position(len(board), board)
@@ -177,17 +226,15 @@ def slide_animation(board, direction, message, animationSpeed):
         movex = blankx 
         movey = blanky - 1
     # print("mx, my", movex, movey)
-    # prepare the base surface
-    draw_board(board, message)
-    baseSurf = DISPLAYSURF.copy()
-    # draw a blank space over the moving tile on the baseSurf Surface.
+    # only the moving tile and the blank space it slides into are redrawn
     moveLeft, moveTop = get_left_top_of_tile(movey, movex)
-    pygame.draw.rect(baseSurf, BGCOLOR, (moveLeft, moveTop, TILESIZE, TILESIZE))
+    blankLeft, blankTop = get_left_top_of_tile(blanky, blankx)
+    area = pygame.Rect(moveLeft, moveTop, TILESIZE, TILESIZE).union(pygame.Rect(blankLeft, blankTop, TILESIZE, TILESIZE))
 
     for i in range(0, TILESIZE, animationSpeed):
         # animate the tile sliding over
         check_for_quit()
-        DISPLAYSURF.blit(baseSurf, (0, 0))
+        DISPLAYSURF.fill(BGCOLOR, area)
         if direction == DOWN:
             draw_tile(movey, movex, board[movex][movey], 0, i)
         if direction == UP:
@@ -197,9 +244,46 @@ def slide_animation(board, direction, message, animationSpeed):
         if direction == LEFT:
             draw_tile(movey, movex, board[movex][movey], -i, 0)
 
-        pygame.display.update()
+        pygame.display.update(area)
         FPSCLOCK.tick(FPS)
 
+def apply_moves(board, moves):
+    """Makes the (tile) moves in order and returns the set of (row, col) cells that changed."""
+    blank_x, blank_y = get_blank_position(len(board), board)
+    changed = {(blank_x, blank_y)}
+    for move in moves:
+        if not is_valid_move(board, move):
+            continue
+        if move == UP:
+            x, y = blank_x + 1, blank_y
+        elif move == DOWN:
+            x, y = blank_x - 1, blank_y
+        elif move == RIGHT:
+            x, y = blank_x, blank_y - 1
+        else:
+            x, y = blank_x, blank_y + 1
+        board[blank_x][blank_y], board[x][y] = board[x][y], BLANK
+        blank_x, blank_y = x, y
+        changed.add((x, y))
+    return changed
+
+def replay_rate(move_count):
+    """Moves made per frame so that a replay takes about REPLAY_SECONDS; 0 means slide every move."""
+    frames = REPLAY_SECONDS * FPS
+    if move_count * (TILESIZE // SLIDE_SPEED + 1) <= frames:
+        return 0
+    return -(-move_count // frames)
+
+def start_replay(replay_data, step):
+    # Tile moves of the packed solution from the given step on, decoded as they are played
+    packed_moves, move_count = replay_data
+    return reverse_directions(npuzzle.iter_moves(packed_moves, move_count, step))
+
+def make_replay_text(step, move_count):
+    if move_count is None:
+        return make_text('', TEXTCOLOR, BGCOLOR, 5, 600)
+    return make_text(f'Step {step} / {move_count} (J: jump)', TEXTCOLOR, BGCOLOR, 5, 600)
+
 def get_spot_clicked(board, x, y):
     # from the x & y pixel coordinates, get the x & y board coordinates
     for tileX in range(len(board)):
@@ -222,26 +306,82 @@ def terminate():
     pygame.quit()
     sys.exit()
 
+# Blank moves -> tile moves, converted lazily so a long solution is never reprocessed as a whole
 def reverse_directions(actions):
-    reversed_actions = []
     for action in actions:
         if action == 'Left':
-            reversed_actions.append('Right')
+            yield 'Right'
         elif action == 'Right':
-            reversed_actions.append('Left')
+            yield 'Left'
         elif action == 'Up':
-            reversed_actions.append('Down')
+            yield 'Down'
         elif action == 'Down':
-            reversed_actions.append('Up')
-    return reversed_actions
+            yield 'Up'
+
+# Solutions are cached on disk, so reloading or resetting a puzzle that was already solved is instant.
+# metrics_queue carries ('progress', event) messages while solving; the solution and its metrics
+# arrive as one packed message on solution_queue (see npuzzle.put_solution). options go to npuzzle.solve
+def run_solver(algorithm, given_state, size, max_depth, solution_queue, metrics_queue, **options):
+    cache = solution_cache.SolutionCache(path=CACHE_FILE)
+    progress = npuzzle.Progress(algorithm, [npuzzle.QueueSink(metrics_queue)], PROGRESS_INTERVAL)
+    limits = npuzzle.SearchLimits(SOLVER_TIME_LIMIT)
+    npuzzle.solve_with_steps(given_state, size, algorithm, max_depth, solution_queue, cache, progress=progress,
+                             limits=limits, **options)
+    cache.close()
 
 def IDS_solver_process(given_state, size, max_depth, solution_queue, metrics_queue):
-    elapsed_time, nodes_visited, total_steps = npuzzle.IDS_with_steps(given_state, size, max_depth, solution_queue)
-    metrics_queue.put((elapsed_time, nodes_visited, total_steps))  # Send time and node count to the main process
+    run_solver('ids', given_state, size, max_depth, solution_queue, metrics_queue)
 
+# DFS paths are often thousands of moves long; shorten them before they are sent and replayed
 def DFS_solver_process(given_state, size, solution_queue, metrics_queue):
-    elapsed_time, nodes_visited, total_steps = npuzzle.DFS_with_steps(given_state, size, solution_queue)
-    metrics_queue.put((elapsed_time, nodes_visited, total_steps))  # Send time and node count to the main process
+    run_solver('dfs', given_state, size, None, solution_queue, metrics_queue, shorten=True)
+
+def IDA_star_solver_process(given_state, size, max_depth, solution_queue, metrics_queue):
+    run_solver('idastar', given_state, size, max_depth, solution_queue, metrics_queue)
+
+def A_star_solver_process(given_state, size, solution_queue, metrics_queue):
+    run_solver('astar', given_state, size, None, solution_queue, metrics_queue)
+
+def bidirectional_solver_process(given_state, size, max_depth, solution_queue, metrics_queue):
+    run_solver('bidir', given_state, size, max_depth, solution_queue, metrics_queue)
+
+def reduction_solver_process(given_state, size, solution_queue, metrics_queue):
+    run_solver('reduce', given_state, size, None, solution_queue, metrics_queue)
+
+def portfolio_solver_process(given_state, size, max_depth, solution_queue, metrics_queue):
+    # Turn Process.terminate() into a normal exit so the portfolio stops the solvers it started
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    progress = npuzzle.Progress('portfolio', [npuzzle.QueueSink(metrics_queue)], PROGRESS_INTERVAL)
+    limits = npuzzle.SearchLimits(SOLVER_TIME_LIMIT)
+    winner = npuzzle.portfolio_with_steps(given_state, size, max_depth, solution_queue, log=PORTFOLIO_LOG,
+                                          progress=progress, limits=limits)[3]
+    print(f"Portfolio winner: {winner}")
+
+def read_progress(metrics_queue, progress_event):
+    """Drains the metrics queue and returns the latest progress event."""
+    while not metrics_queue.empty():
+        kind, payload = metrics_queue.get()
+        if kind == 'progress':
+            progress_event = payload
+    return progress_event
+
+def draw_progress(event):
+    """Live progress panel shown under the metrics while a solver is running."""
+    depth = f"Depth: {event['depth']}"
+    if event['bound'] is not None:
+        depth += f" (bound {event['bound']})"
+    lines = [
+        f"Solver: {event['algorithm']}",
+        f"Nodes: {event['nodes']}",
+        f"Nodes/s: {event['nodes_per_second']:.0f}",
+        depth,
+        f"Frontier: {event['frontier']}",
+        f"Visited: {event['visited']}",
+        f"Memory: ~{event['memory_mb']} MB",
+    ]
+    for i, line in enumerate(lines):
+        text_surf, text_rect = make_text(line, MESSAGECOLOR, BGCOLOR, 5, 130 + 25 * i)
+        DISPLAYSURF.blit(text_surf, text_rect)
 
 total_time = 60
 last_update = pygame.time.get_ticks()
@@ -267,6 +407,19 @@ def convert_to_2D(given_state, size):
         board.append([tile if tile != 0 else None for tile in row])
     return board
 
+def prompt_for_step(move_count):
+    """Prompts user to enter the replay step to jump to."""
+    step = input(f"Jump to step (0-{move_count}): ")
+    try:
+        step = int(step)
+    except ValueError:
+        print("Invalid input. Please enter an integer.")
+        return None
+    if not 0 <= step <= move_count:
+        print(f"Invalid input. Please enter a step between 0 and {move_count}.")
+        return None
+    return step
+
 def prompt_for_size():
     """Prompts user to enter the size (k) for a new puzzle."""
     size = input("Enter the size for a new puzzle (e.g., 3 for 3x3): ")
@@ -295,10 +448,15 @@ def main():
     # Define the solver processes
     IDS_solver = Process(target=IDS_solver_process, args=(given_state, size, 80, solution_queue, metrics_queue))
     DFS_solver = Process(target=DFS_solver_process, args=(given_state, size, solution_queue, metrics_queue))
+    IDA_solver = Process(target=IDA_star_solver_process, args=(given_state, size, 80, solution_queue, metrics_queue))
+    ASTAR_solver = Process(target=A_star_solver_process, args=(given_state, size, solution_queue, metrics_queue))
+    BIDIR_solver = Process(target=bidirectional_solver_process, args=(given_state, size, 80, solution_queue, metrics_queue))
+    PORTFOLIO_solver = Process(target=portfolio_solver_process, args=(given_state, size, 80, solution_queue, metrics_queue))
+    REDUCE_solver = Process(target=reduction_solver_process, args=(given_state, size, solution_queue, metrics_queue))
 
     # Initialize Pygame
     pygame.init()
-    global FPSCLOCK, DISPLAYSURF, BASICFONT, TIME_SURF, TIME_RECT, NODES_SURF, NODES_RECT, TIMER_SURF, TIMER_RECT, DFS_SURF, DFS_RECT, IDS_SURF, IDS_RECT, BOARDHEIGHT, BOARDWIDTH, XMARGIN, YMARGIN, RESET_SURF, RESET_RECT, total_time, last_update, NEWGAME_SURF, NEWGAME_RECT, STEP_SURF, STEP_RECT
+    global FPSCLOCK, DISPLAYSURF, BASICFONT, TIME_SURF, TIME_RECT, NODES_SURF, NODES_RECT, TIMER_SURF, TIMER_RECT, DFS_SURF, DFS_RECT, IDS_SURF, IDS_RECT, IDA_SURF, IDA_RECT, ASTAR_SURF, ASTAR_RECT, BIDIR_SURF, BIDIR_RECT, PORTFOLIO_SURF, PORTFOLIO_RECT, REDUCE_SURF, REDUCE_RECT, BOARDHEIGHT, BOARDWIDTH, XMARGIN, YMARGIN, RESET_SURF, RESET_RECT, total_time, last_update, NEWGAME_SURF, NEWGAME_RECT, STEP_SURF, STEP_RECT, REPLAY_SURF, REPLAY_RECT
     FPSCLOCK = pygame.time.Clock()
     DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
     pygame.display.set_caption('n-puzzle')
@@ -309,9 +467,14 @@ def main():
     YMARGIN = int((WINDOWHEIGHT - (TILESIZE * BOARDHEIGHT + (BOARDHEIGHT - 1))) / 2)
 
     # Variables to track solution progress and metrics
-    all_moves = []
+    replay = None
+    replay_data = None
+    replay_step = 0
+    last_screen = None
     is_solving = False
     elapsed_time = None
+    solve_status = None
+    progress_event = None
     nodes_visited = None
     total_moves = None
     start_time = time.time()
@@ -326,14 +489,29 @@ def main():
     TIMER_SURF, TIMER_RECT = make_text('Time left: ' + str(total_time) + ' (s)', TEXTCOLOR, TILECOLOR, WINDOWWIDTH - 160, 5)
     DFS_SURF, DFS_RECT = make_text('DFS', TEXTCOLOR, TILECOLOR, 480, 570)
     IDS_SURF, IDS_RECT = make_text('IDS', TEXTCOLOR, TILECOLOR, 480, 600)
+    IDA_SURF, IDA_RECT = make_text('IDA*', TEXTCOLOR, TILECOLOR, 560, 570)
+    ASTAR_SURF, ASTAR_RECT = make_text('A*', TEXTCOLOR, TILECOLOR, 560, 600)
+    BIDIR_SURF, BIDIR_RECT = make_text('Bidirectional', TEXTCOLOR, TILECOLOR, 620, 570)
+    PORTFOLIO_SURF, PORTFOLIO_RECT = make_text('Portfolio', TEXTCOLOR, TILECOLOR, 620, 600)
+    REDUCE_SURF, REDUCE_RECT = make_text('Reduction', TEXTCOLOR, TILECOLOR, 370, 600)
     RESET_SURF, RESET_RECT = make_text('Reset Puzzle', TEXTCOLOR,TILECOLOR, 240, 570)
     NEWGAME_SURF, NEWGAME_RECT = make_text('New Puzzle', TEXTCOLOR, TILECOLOR, 240, 600)
+    REPLAY_SURF, REPLAY_RECT = make_replay_text(0, None)
 
     while True:
         check_for_quit()
         for event in pygame.event.get():
             if event.type == QUIT:
                 terminate()
+            elif event.type == KEYUP and event.key == K_j and replay_data is not None:
+                # Jump to a step of the replay: rebuild the board from the start position
+                step = prompt_for_step(replay_data[1])
+                if step is not None:
+                    board = convert_to_2D(given_state, size)
+                    apply_moves(board, itertools.islice(start_replay(replay_data, 0), step))
+                    replay = start_replay(replay_data, step)
+                    replay_step = step
+                    REPLAY_SURF, REPLAY_RECT = make_replay_text(replay_step, replay_data[1])
             elif event.type == MOUSEBUTTONUP:
                 spot_x, spot_y = get_spot_clicked(board, event.pos[0], event.pos[1])
                 if (spot_x, spot_y) == (None, None):
@@ -344,11 +522,12 @@ def main():
                             DFS_solver = Process(target=DFS_solver_process, args=(given_state, size, solution_queue, metrics_queue))
                             DFS_solver.start()
                             is_solving = True
+                            progress_event = None
                             print("DFS started")
                             start_time = time.time()
                             timeout_reached = False
-                            if metrics_queue.qsize() > 0 and elapsed_time is None:
-                                elapsed_time, nodes_visited, total_moves = metrics_queue.get()
+                            if elapsed_time is None:
+                                progress_event = read_progress(metrics_queue, progress_event)
                     # Start IDS solver
                     elif IDS_RECT.collidepoint(event.pos):
                         if not IDS_solver.is_alive():
@@ -356,16 +535,85 @@ def main():
                             IDS_solver = Process(target=IDS_solver_process, args=(given_state, size, 80, solution_queue, metrics_queue))
                             IDS_solver.start()
                             is_solving = True
+                            progress_event = None
                             print("IDS started")
                             start_time = time.time()
                             timeout_reached = False
-                            if metrics_queue.qsize() > 0 and elapsed_time is None:
-                                elapsed_time, nodes_visited, total_moves = metrics_queue.get()
+                            if elapsed_time is None:
+                                progress_event = read_progress(metrics_queue, progress_event)
+                    # Start IDA* solver
+                    elif IDA_RECT.collidepoint(event.pos):
+                        if not IDA_solver.is_alive():
+                            start_timer = True
+                            IDA_solver = Process(target=IDA_star_solver_process, args=(given_state, size, 80, solution_queue, metrics_queue))
+                            IDA_solver.start()
+                            is_solving = True
+                            progress_event = None
+                            print("IDA* started")
+                            start_time = time.time()
+                            timeout_reached = False
+                            if elapsed_time is None:
+                                progress_event = read_progress(metrics_queue, progress_event)
+                    # Start A* solver
+                    elif ASTAR_RECT.collidepoint(event.pos):
+                        if not ASTAR_solver.is_alive():
+                            start_timer = True
+                            ASTAR_solver = Process(target=A_star_solver_process, args=(given_state, size, solution_queue, metrics_queue))
+                            ASTAR_solver.start()
+                            is_solving = True
+                            progress_event = None
+                            print("A* started")
+                            start_time = time.time()
+                            timeout_reached = False
+                            if elapsed_time is None:
+                                progress_event = read_progress(metrics_queue, progress_event)
+                    # Start bidirectional solver
+                    elif BIDIR_RECT.collidepoint(event.pos):
+                        if not BIDIR_solver.is_alive():
+                            start_timer = True
+                            BIDIR_solver = Process(target=bidirectional_solver_process, args=(given_state, size, 80, solution_queue, metrics_queue))
+                            BIDIR_solver.start()
+                            is_solving = True
+                            progress_event = None
+                            print("Bidirectional search started")
+                            start_time = time.time()
+                            timeout_reached = False
+                            if elapsed_time is None:
+                                progress_event = read_progress(metrics_queue, progress_event)
+                    # Start portfolio solver (races several algorithms and keeps the first optimal solution)
+                    elif PORTFOLIO_RECT.collidepoint(event.pos):
+                        if not PORTFOLIO_solver.is_alive():
+                            start_timer = True
+                            PORTFOLIO_solver = Process(target=portfolio_solver_process, args=(given_state, size, 80, solution_queue, metrics_queue))
+                            PORTFOLIO_solver.start()
+                            is_solving = True
+                            progress_event = None
+                            print("Portfolio started")
+                            start_time = time.time()
+                            timeout_reached = False
+                            if elapsed_time is None:
+                                progress_event = read_progress(metrics_queue, progress_event)
+                    # Start row/column reduction solver (fast, not optimal; works on large boards)
+                    elif REDUCE_RECT.collidepoint(event.pos):
+                        if not REDUCE_solver.is_alive():
+                            start_timer = True
+                            REDUCE_solver = Process(target=reduction_solver_process, args=(given_state, size, solution_queue, metrics_queue))
+                            REDUCE_solver.start()
+                            is_solving = True
+                            progress_event = None
+                            print("Reduction started")
+                            start_time = time.time()
+                            timeout_reached = False
+                            if elapsed_time is None:
+                                progress_event = read_progress(metrics_queue, progress_event)
                     if RESET_RECT.collidepoint(event.pos):
                         board = convert_to_2D(given_state, size)
-                        all_moves = []
+                        replay = None
+                        replay_data = None
                         is_solving = False
                         elapsed_time = None
+                        solve_status = None
+                        progress_event = None
                         nodes_visited = None
                         total_moves = None
                         start_timer = False
@@ -377,14 +625,30 @@ def main():
                             DFS_solver.terminate()
                         if IDS_solver.is_alive():
                             IDS_solver.terminate()
+                        if IDA_solver.is_alive():
+                            IDA_solver.terminate()
+                        if ASTAR_solver.is_alive():
+                            ASTAR_solver.terminate()
+                        if BIDIR_solver.is_alive():
+                            BIDIR_solver.terminate()
+                        if PORTFOLIO_solver.is_alive():
+                            PORTFOLIO_solver.terminate()
+                        if REDUCE_solver.is_alive():
+                            REDUCE_solver.terminate()
                         TIME_SURF, TIME_RECT = make_text('Time: ' + str(elapsed_time) + ' (s)', TEXTCOLOR, TILECOLOR, 5, 30)
                         NODES_SURF, NODES_RECT = make_text('Nodes visited: ' + str(nodes_visited), TEXTCOLOR, TILECOLOR, 5, 60)
                         STEP_SURF, STEP_RECT = make_text('Total steps: ' + str(total_moves), TEXTCOLOR, TILECOLOR, 5, 90)
                         TIMER_SURF, TIMER_RECT = make_text('Time left: ' + str(total_time) + ' (s)', TEXTCOLOR, TILECOLOR, WINDOWWIDTH - 160, 5)
                         DFS_SURF, DFS_RECT = make_text('DFS', TEXTCOLOR, TILECOLOR, 480, 570)
                         IDS_SURF, IDS_RECT = make_text('IDS', TEXTCOLOR, TILECOLOR, 480, 600)
+                        IDA_SURF, IDA_RECT = make_text('IDA*', TEXTCOLOR, TILECOLOR, 560, 570)
+                        ASTAR_SURF, ASTAR_RECT = make_text('A*', TEXTCOLOR, TILECOLOR, 560, 600)
+                        BIDIR_SURF, BIDIR_RECT = make_text('Bidirectional', TEXTCOLOR, TILECOLOR, 620, 570)
+                        PORTFOLIO_SURF, PORTFOLIO_RECT = make_text('Portfolio', TEXTCOLOR, TILECOLOR, 620, 600)
+                        REDUCE_SURF, REDUCE_RECT = make_text('Reduction', TEXTCOLOR, TILECOLOR, 370, 600)
                         RESET_SURF, RESET_RECT = make_text('Reset Puzzle', TEXTCOLOR,TILECOLOR, 240, 570)
                         NEWGAME_SURF, NEWGAME_RECT = make_text('New Puzzle', TEXTCOLOR, TILECOLOR, 240, 600)
+                        REPLAY_SURF, REPLAY_RECT = make_replay_text(0, None)
                     if NEWGAME_RECT.collidepoint(event.pos):
                         k = prompt_for_size()
                         if k is not None and k >= 2:
@@ -398,9 +662,12 @@ def main():
                         puzzles = npuzzle.readInput(input_file_path)                        
                         size, given_state = puzzles[0]
                         board = convert_to_2D(given_state, size)
-                        all_moves = []
+                        replay = None
+                        replay_data = None
                         is_solving = False
                         elapsed_time = None
+                        solve_status = None
+                        progress_event = None
                         nodes_visited = None
                         total_moves = None
                         start_timer = False
@@ -412,17 +679,32 @@ def main():
                             DFS_solver.terminate()
                         if IDS_solver.is_alive():
                             IDS_solver.terminate()
+                        if IDA_solver.is_alive():
+                            IDA_solver.terminate()
+                        if ASTAR_solver.is_alive():
+                            ASTAR_solver.terminate()
+                        if BIDIR_solver.is_alive():
+                            BIDIR_solver.terminate()
+                        if PORTFOLIO_solver.is_alive():
+                            PORTFOLIO_solver.terminate()
+                        if REDUCE_solver.is_alive():
+                            REDUCE_solver.terminate()
                         TIME_SURF, TIME_RECT = make_text('Time: ' + str(elapsed_time) + ' (s)', TEXTCOLOR, TILECOLOR, 5, 30)
                         NODES_SURF, NODES_RECT = make_text('Nodes visited: ' + str(nodes_visited), TEXTCOLOR, TILECOLOR, 5, 60)
                         STEP_SURF, STEP_RECT = make_text('Total steps: ' + str(total_moves), TEXTCOLOR, TILECOLOR, 5, 90)
                         TIMER_SURF, TIMER_RECT = make_text('Time left: ' + str(total_time) + ' (s)', TEXTCOLOR, TILECOLOR, WINDOWWIDTH - 160, 5)
                         DFS_SURF, DFS_RECT = make_text('DFS', TEXTCOLOR, TILECOLOR, 480, 570)
                         IDS_SURF, IDS_RECT = make_text('IDS', TEXTCOLOR, TILECOLOR, 480, 600)
+                        IDA_SURF, IDA_RECT = make_text('IDA*', TEXTCOLOR, TILECOLOR, 560, 570)
+                        ASTAR_SURF, ASTAR_RECT = make_text('A*', TEXTCOLOR, TILECOLOR, 560, 600)
+                        BIDIR_SURF, BIDIR_RECT = make_text('Bidirectional', TEXTCOLOR, TILECOLOR, 620, 570)
+                        PORTFOLIO_SURF, PORTFOLIO_RECT = make_text('Portfolio', TEXTCOLOR, TILECOLOR, 620, 600)
+                        REDUCE_SURF, REDUCE_RECT = make_text('Reduction', TEXTCOLOR, TILECOLOR, 370, 600)
                         RESET_SURF, RESET_RECT = make_text('Reset Puzzle', TEXTCOLOR,TILECOLOR, 240, 570)
                         NEWGAME_SURF, NEWGAME_RECT = make_text('New Puzzle', TEXTCOLOR, TILECOLOR, 240, 600)
+                        REPLAY_SURF, REPLAY_RECT = make_replay_text(0, None)
 
         # Check if the 60-second limit has been reached
-        DISPLAYSURF.blit(TIMER_SURF, TIMER_RECT)
         if start_timer and is_solving:
             update_timer()
         
@@ -441,59 +723,110 @@ def main():
                 IDS_solver.terminate()
                 start_timer = False
                 print("IDS took too long to solve...")
+            if IDA_solver.is_alive():
+                IDA_solver.terminate()
+                start_timer = False
+                print("IDA* took too long to solve...")
+            if ASTAR_solver.is_alive():
+                ASTAR_solver.terminate()
+                start_timer = False
+                print("A* took too long to solve...")
+            if BIDIR_solver.is_alive():
+                BIDIR_solver.terminate()
+                start_timer = False
+                print("Bidirectional search took too long to solve...")
+            if PORTFOLIO_solver.is_alive():
+                PORTFOLIO_solver.terminate()
+                start_timer = False
+                print("Portfolio took too long to solve...")
+            if REDUCE_solver.is_alive():
+                REDUCE_solver.terminate()
+                start_timer = False
+                print("Reduction took too long to solve...")
 
-            if metrics_queue.qsize() > 0 and elapsed_time is None:
-                elapsed_time, nodes_visited, total_moves = metrics_queue.get()
-
-        if metrics_queue.qsize() > 0 and elapsed_time is None:
-            elapsed_time, nodes_visited, total_moves = metrics_queue.get()
+            if elapsed_time is None:
+                progress_event = read_progress(metrics_queue, progress_event)
 
-        # Read moves from solution_queue if time has not run out
-        if not timeout_reached:
-            while not solution_queue.empty():
-                move = solution_queue.get()
-                if move == "DONE":
-                    is_solving = False
-                    print("Giải thuật đã hoàn tất!")
-                    break
-                all_moves.append(move)
+        if elapsed_time is None:
+            progress_event = read_progress(metrics_queue, progress_event)
 
-        # Prepare reversed moves for animation
-        reversed_moves = reverse_directions(all_moves)
-        
-        # Draw the current board and status
-        draw_board(board, status_message)
+        # Read the packed solution (one message with the moves and metrics) if time has not run out
+        if not timeout_reached and not solution_queue.empty():
+            _, move_count, packed_moves, (solve_time, solve_nodes, solve_status) = solution_queue.get()
+            is_solving = False
+            print("Giải thuật đã hoàn tất!")
+            if elapsed_time is None:
+                elapsed_time, nodes_visited, total_moves = solve_time, solve_nodes, max(move_count, 0)
+            # Moves are decoded while the replay plays, starting from the solved position
+            board = convert_to_2D(given_state, size)
+            replay_data = (packed_moves, max(move_count, 0))
+            replay = start_replay(replay_data, 0)
+            replay_step = 0
+            REPLAY_SURF, REPLAY_RECT = make_replay_text(replay_step, replay_data[1])
+
+        # Update the status
         if is_solving:
             status_message = "Solving the puzzle..."
+        elif replay is not None:
+            status_message = "Simulating the solution..."
         elif not is_solving and elapsed_time is not None:
-            if not timeout_reached and elapsed_time is not None:
+            # The solver stopped itself at its time limit, or searched everything within max_depth
+            if solve_status == 'timeout':
+                status_message = "Took too long to solve!"
+            elif solve_status not in (None, 'solved'):
+                status_message = "No solution found!"
+            elif not timeout_reached and elapsed_time is not None:
                 status_message = "Solved!"
             elif timeout_reached and elapsed_time is None:
                 status_message = "Took too long to solve!"
-        draw_board(board, status_message)
 
         if elapsed_time is not None or nodes_visited is not None:
             TIME_SURF, TIME_RECT = make_text('Time: ' + str(elapsed_time) + ' (s)', TEXTCOLOR, TILECOLOR, 5, 30)
             NODES_SURF, NODES_RECT = make_text('Nodes visited: ' + str(nodes_visited), TEXTCOLOR, TILECOLOR, 5, 60)
             STEP_SURF, STEP_RECT = make_text('Total steps: ' + str(total_moves), TEXTCOLOR, TILECOLOR, 5, 90)
-        DISPLAYSURF.blit(TIME_SURF, TIME_RECT)
-        DISPLAYSURF.blit(NODES_SURF, NODES_RECT)
-
-        # Perform the moves animation
-        if reversed_moves:
-            move = reversed_moves.pop(0)
-            all_moves.pop(0)
-            if is_valid_move(board, move):
-                slide_animation(board, move, "Simulating the solution...", 10)
-                make_move(board, move)
-                pygame.display.update()
-                FPSCLOCK.tick(FPS)
-
-        pygame.display.update()
+
+        # Draw the whole screen only when something on it changed
+        shown_progress = progress_event if is_solving else None
+        screen = screen_state(board, status_message, shown_progress)
+        if screen != last_screen:
+            draw_board(board, status_message)
+            if shown_progress is not None:
+                draw_progress(shown_progress)
+            pygame.display.update()
+            last_screen = screen
+
+        # Replay the solution: short ones slide move by move, long ones make several moves per frame
+        # (see replay_rate); only the cells that changed and the step counter are redrawn
+        if replay is not None:
+            rate = replay_rate(replay_data[1])
+            if rate == 0:
+                moves = list(itertools.islice(replay, 1))
+                if moves and is_valid_move(board, moves[0]):
+                    slide_animation(board, moves[0], SLIDE_SPEED)
+            else:
+                moves = list(itertools.islice(replay, rate))
+            if moves:
+                dirty_rects = draw_cells(board, apply_moves(board, moves))
+                replay_step += len(moves)
+                DISPLAYSURF.fill(BGCOLOR, REPLAY_RECT)
+                dirty_rects.append(REPLAY_RECT)
+                REPLAY_SURF, REPLAY_RECT = make_replay_text(replay_step, replay_data[1])
+                DISPLAYSURF.blit(REPLAY_SURF, REPLAY_RECT)
+                dirty_rects.append(REPLAY_RECT)
+                pygame.display.update(dirty_rects)
+                last_screen = screen_state(board, status_message, shown_progress)
+            else:
+                replay = None
+
         FPSCLOCK.tick(FPS)
 
     IDS_solver.join()
     DFS_solver.join()
+    IDA_solver.join()
+    ASTAR_solver.join()
+    BIDIR_solver.join()
+    PORTFOLIO_solver.join()
+    REDUCE_solver.join()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,299 @@
+import sys
+import json
+import random
+import hashlib
+import argparse
+import platform
+from time import time
+from multiprocessing import Process, Queue
+import queue
+import numpy as np
+import npuzzle
+import test
+
+try:
+    import resource
+except ImportError:  # Windows: không đo được bộ nhớ đỉnh
+    resource = None
+
+DEFAULT_SEED = 2024
+# Các khoảng độ dài lời giải tối ưu dùng cho bộ bài toán phân tầng
+STRATA = ((14, 17), (18, 21), (22, 25), (26, 31))
+# Các chỉ số so sánh với baseline: True nếu giá trị lớn hơn là tệ hơn
+METRICS = {
+    'time': True,
+    'nodes': True,
+    'peak_rss_mb': True,
+    'mean_length': True,
+    'nodes_per_second': False,
+    'solved': False,
+}
+
+def _random_walk(size, steps, rng):
+    """
+    Đi ngẫu nhiên steps bước từ trạng thái mục tiêu (không đi ngược lại bước vừa đi).
+    """
+    context = npuzzle.get_context(size)
+    board = list(context.goal)
+    blank = board.index(0)
+    last = npuzzle.NO_MOVE
+    for _ in range(steps):
+        move, target = rng.choice([(move, target) for move, target in context.moves[blank]
+                                   if last == npuzzle.NO_MOVE or move != npuzzle.INVERSE[last]])
+        board[blank], board[target] = board[target], 0
+        blank, last = target, move
+    return board
+
+def corpus_3x3(count=20, seed=DEFAULT_SEED):
+    """
+    Các bàn cờ 3x3 ngẫu nhiên (luôn giải được) sinh bởi test.generate_puzzle.
+    """
+    np.random.seed(seed)
+    return [(3, test.generate_puzzle(3).flatten().tolist()) for _ in range(count)]
+
+def corpus_15puzzle(count=100, seed=DEFAULT_SEED):
+    """
+    Bộ 100 bàn cờ 4x4 cố định, sinh bằng cách đi ngẫu nhiên 30-60 bước từ trạng thái mục tiêu để
+    mọi giải thuật đều có thể chạy hết trong thời gian hợp lý.
+    """
+    rng = random.Random(seed)
+    return [(4, _random_walk(4, rng.randint(30, 60), rng)) for _ in range(count)]
+
+def corpus_stratified(count=20, seed=DEFAULT_SEED, strata=STRATA, max_attempts=20000):
+    """
+    Bàn cờ 3x3 từ test.generate_puzzle, được chọn theo độ dài lời giải tối ưu để mỗi khoảng
+    trong strata có cùng số bài toán.
+    """
+    np.random.seed(seed)
+    per_stratum = max(1, count // len(strata))
+    buckets = [[] for _ in strata]
+    for _ in range(max_attempts):
+        if all(len(bucket) >= per_stratum for bucket in buckets):
+            break
+        board = test.generate_puzzle(3).flatten().tolist()
+        solution, _ = npuzzle.IDA_star(board, 3)
+        for bucket, (low, high) in zip(buckets, strata):
+            if low <= len(solution) <= high and len(bucket) < per_stratum:
+                bucket.append((3, board))
+    return [puzzle for bucket in buckets for puzzle in bucket]
+
+CORPORA = {
+    '3x3': corpus_3x3,
+    '15puzzle': corpus_15puzzle,
+    'stratified': corpus_stratified,
+}
+
+def corpus_digest(puzzles):
+    """
+    Dấu vân tay của một bộ bài toán, dùng để phát hiện so sánh giữa hai bộ bài toán khác nhau.
+    """
+    digest = hashlib.sha1()
+    for size, board in puzzles:
+        digest.update(f"{size}:{','.join(map(str, board))};".encode())
+    return digest.hexdigest()[:16]
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # Tính cả các tiến trình con (pidastar, portfolio)
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss tính bằng byte trên macOS và KB trên Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+# Tiến trình con: giải một bài toán và gửi lại các số đo; mỗi bài chạy trong tiến trình riêng để
+# bộ nhớ đỉnh không bị ảnh hưởng bởi các bài trước
+def _measure(algorithm, size, board, max_depth, timeout, memory_mb, results, processes=None):
+    if memory_mb and resource is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    solution, nodes_visited = None, 0
+    start_time = time()
+    try:
+        # Đo chính giải thuật, không dùng bảng khoảng cách 3x3; hết thời gian thì giải thuật tự dừng
+        options = {'processes': processes} if algorithm == 'pidastar' and processes else {}
+        result = npuzzle.solve(board, size, algorithm, max_depth, use_table=False,
+                               limits=npuzzle.SearchLimits(timeout), **options)
+        solution, nodes_visited = result
+        status = {'solved': 'ok', 'exhausted': 'unsolved'}.get(result.status, result.status)
+    except MemoryError:
+        status = 'memory'
+    elapsed_time = time() - start_time
+    results.put({
+        'status': status,
+        'length': len(solution) if solution is not None else None,
+        'nodes': nodes_visited,
+        'time': round(elapsed_time, 6),
+        'nodes_per_second': round(nodes_visited / elapsed_time, 1) if elapsed_time else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+    })
+
+def run_instance(algorithm, size, board, max_depth=80, timeout=10.0, memory_mb=4096, processes=None):
+    results = Queue()
+    worker = Process(target=_measure, args=(algorithm, size, board, max_depth, timeout, memory_mb, results,
+                                            processes))
+    worker.start()
+    # Chờ thêm một khoảng cho trường hợp giải thuật không kịp kiểm tra giới hạn (ví dụ một tầng NumPy rất lớn)
+    deadline = None if timeout is None else time() + timeout + 30
+    record = None
+    try:
+        while record is None:
+            try:
+                record = results.get(timeout=1)
+            except queue.Empty:
+                # Tiến trình con đã chết (ví dụ bị hệ điều hành giết vì hết bộ nhớ) hoặc quá hạn
+                if not worker.is_alive() and results.empty():
+                    record = {'status': 'error'}
+                elif deadline is not None and time() > deadline:
+                    record = {'status': 'timeout'}
+    finally:
+        if worker.is_alive():
+            worker.terminate()
+        worker.join()
+    if record['status'] in ('error', 'timeout') and 'time' not in record:
+        record.update(length=None, nodes=0, time=timeout or 0.0, nodes_per_second=0.0, peak_rss_mb=None)
+    return record
+
+def summarize(records):
+    """
+    Gộp số đo của các bài toán thuộc cùng một cặp (bộ bài toán, giải thuật).
+    """
+    solved = [record for record in records if record['status'] == 'ok']
+    total_time = sum(record['time'] for record in records)
+    total_nodes = sum(record['nodes'] for record in records)
+    peaks = [record['peak_rss_mb'] for record in records if record.get('peak_rss_mb') is not None]
+    return {
+        'instances': len(records),
+        'solved': len(solved),
+        'time': round(total_time, 6),
+        'nodes': total_nodes,
+        'nodes_per_second': round(total_nodes / total_time, 1) if total_time else 0.0,
+        'peak_rss_mb': round(max(peaks), 2) if peaks else None,
+        'mean_length': round(sum(record['length'] for record in solved) / len(solved), 3) if solved else None,
+    }
+
+def run(corpora, algorithms, count=None, seed=DEFAULT_SEED, max_depth=80, timeout=10.0, memory_mb=4096,
+        verbose=False, processes=None):
+    """
+    Chạy mọi giải thuật trên mọi bộ bài toán và trả về báo cáo dạng dict (có thể ghi ra JSON).
+    processes là số tiến trình con của pidastar (mặc định bằng số CPU).
+    """
+    report = {
+        'meta': {
+            'seed': seed,
+            'max_depth': max_depth,
+            'timeout': timeout,
+            'memory_mb': memory_mb,
+            'processes': processes,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created': round(time()),
+            'corpora': {},
+        },
+        'results': {},
+        'instances': [],
+    }
+    for corpus in corpora:
+        puzzles = CORPORA[corpus](count, seed) if count else CORPORA[corpus](seed=seed)
+        report['meta']['corpora'][corpus] = {'instances': len(puzzles), 'digest': corpus_digest(puzzles)}
+        for algorithm in algorithms:
+            records = []
+            for index, (size, board) in enumerate(puzzles):
+                record = run_instance(algorithm, size, board, max_depth, timeout, memory_mb, processes)
+                records.append(record)
+                report['instances'].append(dict(corpus=corpus, algorithm=algorithm, index=index, **record))
+                if verbose:
+                    print(f"{corpus}/{algorithm} #{index}: {record['status']} length={record.get('length')} "
+                          f"nodes={record.get('nodes')} time={record.get('time')}")
+            summary = summarize(records)
+            report['results'][f"{corpus}/{algorithm}"] = summary
+            print(f"{corpus}/{algorithm}: solved {summary['solved']}/{summary['instances']}, "
+                  f"{summary['time']:.2f} second, {summary['nodes']} nodes, {summary['nodes_per_second']:.0f} nodes/s, "
+                  f"peak {summary['peak_rss_mb']} MB")
+    return report
+
+def compare(current, baseline, threshold=0.10):
+    """
+    So sánh hai báo cáo. Trả về danh sách các chỉ số tệ hơn baseline quá threshold (tỉ lệ tương đối),
+    mỗi phần tử là dict (group, metric, baseline, current, change).
+    """
+    regressions = []
+    for group, summary in current['results'].items():
+        reference = baseline['results'].get(group)
+        if reference is None:
+            continue
+        corpus = group.split('/')[0]
+        digest = current['meta']['corpora'].get(corpus, {}).get('digest')
+        if digest != baseline['meta']['corpora'].get(corpus, {}).get('digest'):
+            print(f"Warning: corpus {corpus} differs from the baseline, skipping {group}")
+            continue
+        for metric, higher_is_worse in METRICS.items():
+            old, new = reference.get(metric), summary.get(metric)
+            if old is None or new is None:
+                continue
+            if old == 0:
+                change = 0.0 if new == 0 else float('inf')
+            else:
+                change = (new - old) / old
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append({'group': group, 'metric': metric, 'baseline': old, 'current': new,
+                                    'change': round(change, 4)})
+    return regressions
+
+def _print_regressions(regressions, threshold):
+    if not regressions:
+        print(f"No regressions above {threshold:.0%}")
+        return
+    for regression in regressions:
+        print(f"REGRESSION {regression['group']} {regression['metric']}: {regression['baseline']} -> "
+              f"{regression['current']} ({regression['change']:+.1%})")
+
+def main():
+    parser = argparse.ArgumentParser(description="N-Puzzle solver benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark suite and write a JSON report")
+    run_parser.add_argument("-c", "--corpus", nargs="+", choices=sorted(CORPORA), default=sorted(CORPORA))
+    run_parser.add_argument("-a", "--algorithms", nargs="+", choices=sorted(npuzzle.SOLVERS),
+                            default=sorted(npuzzle.SOLVERS))
+    run_parser.add_argument("-n", "--count", type=int, help="instances per corpus (default: 20, 100 for 15puzzle)")
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_parser.add_argument("--max-depth", type=int, default=80)
+    run_parser.add_argument("--timeout", type=float, default=10.0, help="time limit per instance (seconds)")
+    run_parser.add_argument("--memory-mb", type=int, default=4096, help="address space limit per instance, 0 disables it")
+    run_parser.add_argument("-o", "--output", default="benchmark.json")
+    run_parser.add_argument("--baseline", help="report to compare against")
+    run_parser.add_argument("--threshold", type=float, default=0.10, help="relative change reported as a regression")
+    run_parser.add_argument("-v", "--verbose", action="store_true", help="print every instance")
+    run_parser.add_argument("--processes", type=int, help="worker processes of pidastar (default: CPU count)")
+
+    compare_parser = commands.add_parser("compare", help="compare a report against a baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.corpus, args.algorithms, args.count, args.seed, args.max_depth, args.timeout,
+                     args.memory_mb, args.verbose, args.processes)
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Report written to {args.output}")
+        if args.baseline is None:
+            return
+        current = report
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    else:
+        with open(args.current) as file:
+            current = json.load(file)
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    regressions = compare(current, baseline, args.threshold)
+    _print_regressions(regressions, args.threshold)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import os
+import sys
+import mmap
+import struct
+import argparse
+from time import time
+import npuzzle
+
+# Định dạng file bảng: header cố định rồi 9! byte, byte thứ rank(board) = (khoảng cách << 2) | nước đi tốt nhất
+MAGIC = b'NP8T'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHB')   # magic, version, size
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+DEFAULT_PATH = os.path.join(TABLE_DIR, 'eight_puzzle.bin')
+SIZE = 3
+N = SIZE * SIZE
+UNSEEN = 255 # Giá trị của các hoán vị không giải được
+
+FACTORIALS = [1] * N
+for i in range(1, N):
+    FACTORIALS[i] = FACTORIALS[i - 1] * i
+TABLE_LENGTH = FACTORIALS[N - 1] * N
+
+def rank(board):
+    """
+    Xếp hạng hoán vị theo mã Lehmer: hàm băm hoàn hảo từ 9! hoán vị vào 0..9!-1.
+    """
+    index = 0
+    for i in range(N - 1):
+        smaller = 0
+        tile = board[i]
+        for later in board[i + 1:]:
+            if later < tile:
+                smaller += 1
+        index += smaller * FACTORIALS[N - 1 - i]
+    return index
+
+def build_table():
+    """
+    BFS từ trạng thái mục tiêu trên toàn bộ 181440 trạng thái giải được. Với mỗi trạng thái lưu
+    khoảng cách tới mục tiêu và nước đi (của ô trống) bắt đầu một lời giải tối ưu.
+    """
+    context = npuzzle.get_context(SIZE)
+    table = bytearray([UNSEEN]) * TABLE_LENGTH
+    goal = list(context.goal)
+    table[rank(goal)] = 0
+    current = [(goal, goal.index(0))]
+    distance = 0
+    while current:
+        distance += 1
+        following = []
+        for board, blank in current:
+            for move, target in context.moves[blank]:
+                child = board[:]
+                child[blank], child[target] = child[target], 0
+                index = rank(child)
+                if table[index] == UNSEEN:
+                    # Từ trạng thái con, đi ngược nước vừa đi là về gần mục tiêu hơn một bước
+                    table[index] = (distance << 2) | npuzzle.INVERSE[move]
+                    following.append((child, target))
+        current = following
+    return table
+
+def save(table, path=DEFAULT_PATH):
+    # Ghi qua file tạm rồi thay thế: tiến trình khác có thể đang ánh xạ file cũ
+    with npuzzle.replace_file(path) as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, SIZE))
+        file.write(table)
+
+def load(path=DEFAULT_PATH):
+    # Ánh xạ file vào bộ nhớ: các tiến trình cùng đọc một file sẽ dùng chung các trang nhớ
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, size = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not an 8-puzzle table file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} has table format version {version}, expected {FORMAT_VERSION}")
+    if len(buffer) - HEADER.size != TABLE_LENGTH:
+        raise ValueError(f"{path} is truncated")
+    return memoryview(buffer)[HEADER.size:]
+
+_table = None
+
+def get_table(path=DEFAULT_PATH):
+    """
+    Nạp bảng khi cần lần đầu; nếu chưa có file thì sinh bảng (vài giây) và ghi lại để dùng về sau.
+    """
+    global _table
+    if _table is None:
+        if not os.path.exists(path):
+            save(build_table(), path)
+        _table = load(path)
+    return _table
+
+def distance(board):
+    # Độ dài lời giải tối ưu, None nếu bàn cờ không giải được
+    entry = get_table()[rank(board)]
+    return None if entry == UNSEEN else entry >> 2
+
+def solve(given_state):
+    """
+    Lời giải tối ưu cho bàn cờ 3x3 bằng cách đi theo nước đi tốt nhất lưu trong bảng.
+    Trả về (lời giải, số lần tra bảng) như các giải thuật trong npuzzle.
+    """
+    table = get_table()
+    moves = npuzzle.get_context(SIZE).moves
+    board = list(given_state)
+    blank = board.index(0)
+    entry = table[rank(board)]
+    if entry == UNSEEN:
+        return None, 1
+    solution = []
+    while entry >> 2:
+        move = entry & 3
+        target = dict(moves[blank])[move]
+        board[blank], board[target] = board[target], 0
+        blank = target
+        solution.append(npuzzle.ACTIONS[move])
+        entry = table[rank(board)]
+    return solution, len(solution) + 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Complete 8-puzzle distance table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="generate the table file")
+    build_parser.add_argument("-o", "--output", default=DEFAULT_PATH)
+    info_parser = subparsers.add_parser("info", help="show statistics of a table file")
+    info_parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start_time = time()
+        save(build_table(), args.output)
+        print(f"Written to {args.output} in {time() - start_time:.1f} second")
+    else:
+        table = load(args.path)
+        distances = [entry >> 2 for entry in table if entry != UNSEEN]
+        print(f"Format version {FORMAT_VERSION}, {len(distances)} solvable states, max distance {max(distances)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,194 @@
+import argparse
+from time import time
+import numpy as np
+import npuzzle
+
+def count_inversions(arr):
+    """
+    Đếm số cặp đảo vị (bỏ ô trống) bằng cây Fenwick, độ phức tạp O(n log n).
+    """
+    values = [num for num in arr if num != 0]
+    tree = [0] * (len(arr) + 1)
+    inversions = 0
+    # Duyệt từ phải sang trái: đếm các số nhỏ hơn đã gặp ở bên phải
+    for value in reversed(values):
+        i = value - 1
+        while i > 0:
+            inversions += tree[i]
+            i -= i & -i
+        i = value
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
+    return inversions
+
+def count_inversions_batch(boards):
+    """
+    Đếm số cặp đảo vị cho cả một mảng bàn cờ (N, n) cùng lúc: cây Fenwick được vector hoá theo
+    chiều N, mỗi bước truy vấn/cập nhật là một phép toán trên toàn bộ mảng.
+    """
+    boards = np.asarray(boards, dtype=np.int64)
+    count, n = boards.shape
+    rows = np.arange(count)
+    tree = np.zeros((count, n + 1), dtype=np.int64)
+    inversions = np.zeros(count, dtype=np.int64)
+    for pos in range(n - 1, -1, -1):
+        values = boards[:, pos]
+        active = values != 0
+        # Truy vấn số giá trị nhỏ hơn values đã gặp (ô trống có giá trị 0 nên truy vấn rỗng)
+        i = values - 1
+        i[~active] = 0
+        while i.any():
+            inversions += tree[rows, i]
+            i -= i & -i
+        i = values.copy()
+        i[~active] = n + 1
+        while True:
+            live = i <= n
+            if not live.any():
+                break
+            tree[rows[live], i[live]] += 1
+            i[live] += i[live] & -i[live]
+    return inversions
+
+def is_solvable_batch(boards, size):
+    """
+    Kiểm tra điều kiện giải được cho mảng bàn cờ (N, n), cùng quy tắc với test.is_solvable.
+    """
+    boards = np.asarray(boards)
+    inversions = count_inversions_batch(boards)
+    if size % 2 == 1:
+        return inversions % 2 == 0
+    blank_row = np.argmax(boards == 0, axis=1) // size
+    return (inversions + blank_row) % 2 == 1
+
+def manhattan_batch(boards, size):
+    """
+    Tổng khoảng cách Manhattan của mảng bàn cờ (N, n).
+    """
+    boards = np.asarray(boards)
+    positions = np.arange(size * size)
+    goal = np.maximum(boards - 1, 0)
+    distance = np.abs(positions // size - goal // size) + np.abs(positions % size - goal % size)
+    return np.where(boards != 0, distance, 0).sum(axis=1)
+
+def uniform(count, size, rng):
+    """
+    count bàn cờ ngẫu nhiên đều trên tập trạng thái giải được. Hoán vị ngẫu nhiên không giải được
+    được sửa bằng cách đổi chỗ hai ô số đầu tiên (đổi tính chẵn lẻ) thay vì sinh lại.
+    """
+    n = size * size
+    boards = np.argsort(rng.random((count, n)), axis=1)
+    bad = ~is_solvable_batch(boards, size)
+    if bad.any():
+        rows = np.nonzero(bad)[0]
+        # Hai vị trí đầu tiên không chứa ô trống
+        first = np.where(boards[rows, 0] == 0, 1, 0)
+        second = np.where(boards[rows, 0] == 0, 2, np.where(boards[rows, 1] == 0, 2, 1))
+        boards[rows, first], boards[rows, second] = boards[rows, second], boards[rows, first].copy()
+    return boards
+
+def random_walk(count, size, steps, rng):
+    """
+    count bàn cờ sinh bằng cách đi ngẫu nhiên steps bước (không đi ngược bước vừa đi) từ trạng thái
+    mục tiêu; steps có thể là một số hoặc khoảng (min, max) chọn ngẫu nhiên cho từng bàn cờ.
+    """
+    context = npuzzle.get_context(size)
+    n = size * size
+    legal = np.zeros((n, 4), dtype=bool)
+    target = np.zeros((n, 4), dtype=np.int64)
+    for x, moves in enumerate(context.moves):
+        for move, new_blank in moves:
+            legal[x, move] = True
+            target[x, move] = new_blank
+    inverse = np.array(npuzzle.INVERSE + (npuzzle.NO_MOVE,))
+
+    if isinstance(steps, int):
+        walk_lengths = np.full(count, steps)
+    else:
+        walk_lengths = rng.integers(steps[0], steps[1] + 1, size=count)
+    boards = np.tile(np.array(context.goal, dtype=np.int64), (count, 1))
+    blanks = np.full(count, n - 1)
+    last = np.full(count, npuzzle.NO_MOVE)
+    rows = np.arange(count)
+    for step in range(walk_lengths.max() if count else 0):
+        walking = walk_lengths > step
+        allowed = legal[blanks] & (np.arange(4) != inverse[last][:, None])
+        # Chọn ngẫu nhiên một nước đi hợp lệ: điểm ngẫu nhiên lớn nhất trong các nước được phép
+        move = np.argmax(np.where(allowed, rng.random((count, 4)), -1.0), axis=1)
+        new_blanks = target[blanks, move]
+        rows_walking = rows[walking]
+        boards[rows_walking, blanks[walking]] = boards[rows_walking, new_blanks[walking]]
+        boards[rows_walking, new_blanks[walking]] = 0
+        blanks = np.where(walking, new_blanks, blanks)
+        last = np.where(walking, move, last)
+    return boards
+
+def generate(count, size, method='uniform', steps=(20, 60), heuristic_range=None, length_range=None,
+             seed=None, batch_size=1024, max_batches=1000):
+    """
+    Sinh count bàn cờ size x size theo từng lô NumPy. heuristic_range=(min, max) lọc theo khoảng cách
+    Manhattan; length_range=(min, max) lọc theo độ dài lời giải tối ưu (giải bằng IDA*, chỉ áp dụng
+    cho các bàn cờ đã qua bộ lọc Manhattan vì Manhattan <= độ dài tối ưu).
+    Trả về list (size, board) như npuzzle.readInput.
+    """
+    rng = np.random.default_rng(seed)
+    accepted = []
+    for _ in range(max_batches):
+        if len(accepted) >= count:
+            break
+        if method == 'uniform':
+            boards = uniform(batch_size, size, rng)
+        else:
+            boards = random_walk(batch_size, size, steps, rng)
+        keep = np.ones(len(boards), dtype=bool)
+        if heuristic_range is not None or length_range is not None:
+            h = manhattan_batch(boards, size)
+            if heuristic_range is not None:
+                keep &= (h >= heuristic_range[0]) & (h <= heuristic_range[1])
+            if length_range is not None:
+                keep &= h <= length_range[1]
+        for board in boards[keep]:
+            board = board.tolist()
+            if length_range is not None:
+                solution, _ = npuzzle.IDA_star(board, size, length_range[1])
+                if solution is None or len(solution) < length_range[0]:
+                    continue
+            accepted.append((size, board))
+            if len(accepted) == count:
+                break
+    if len(accepted) < count:
+        raise ValueError(f"only {len(accepted)} of {count} puzzles matched the difficulty targets")
+    return accepted
+
+def write_puzzles(puzzles, filename="input.txt"):
+    """
+    Ghi các bài toán theo định dạng nhiều bài của input.txt (số bài, rồi kích thước và các hàng của từng bài).
+    """
+    with open(filename, "w") as file:
+        file.write(f"{len(puzzles)}\n")
+        for size, board in puzzles:
+            file.write(f"{size}\n")
+            for row in range(size):
+                file.write(" ".join(map(str, board[row * size:(row + 1) * size])) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="N-Puzzle generator")
+    parser.add_argument("-n", "--count", type=int, default=1)
+    parser.add_argument("-s", "--size", type=int, default=3)
+    parser.add_argument("-m", "--method", choices=("uniform", "walk"), default="uniform")
+    parser.add_argument("--steps", type=int, nargs=2, metavar=("MIN", "MAX"), default=(20, 60),
+                        help="random walk length range")
+    parser.add_argument("--heuristic", type=int, nargs=2, metavar=("MIN", "MAX"), help="Manhattan distance range")
+    parser.add_argument("--length", type=int, nargs=2, metavar=("MIN", "MAX"), help="optimal solution length range")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("-o", "--output", default="input.txt")
+    args = parser.parse_args()
+
+    start_time = time()
+    puzzles = generate(args.count, args.size, args.method, tuple(args.steps), args.heuristic, args.length, args.seed)
+    write_puzzles(puzzles, args.output)
+    print(f"{len(puzzles)} puzzles written to {args.output} in {time() - start_time:.2f} second")
+
+if __name__ == "__main__":
+    main()
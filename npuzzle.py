@@ -1,192 +1,659 @@
 from queue import LifoQueue
 from time import time
+import os
+import sys
+import json
+import heapq
+import logging
+import argparse
+import tempfile
+from contextlib import contextmanager
+from itertools import islice
+from array import array
+from collections import deque
+from multiprocessing import Pool, Process, Queue, Event
+import queue
+
+# Mã số của các nước đi (hướng di chuyển của ô trống); chuỗi chỉ được tạo khi dựng lời giải
+LEFT, RIGHT, UP, DOWN = 0, 1, 2, 3
+ACTIONS = ('Left', 'Right', 'Up', 'Down')
+INVERSE = (RIGHT, LEFT, DOWN, UP)
+NO_MOVE = 4 # Chỉ số dùng cho nút gốc (không có nước đi cha)
+
+class PuzzleContext:
+    """
+    Dữ liệu dùng chung cho mọi nút có cùng kích thước (trạng thái mục tiêu, cách nén bàn cờ),
+    được tạo một lần cho mỗi kích thước thay vì lưu lại trong từng nút.
+    """
+    __slots__ = ('size', 'n', 'goal', 'bits', 'mask', 'goal_packed', 'moves', 'successors')
+
+    def __init__(self, size):
+        self.size = size
+        self.n = size * size
+        # Goal state: [1,2,...,k*k - 1,0]
+        self.goal = list(range(1, self.n)) + [0]
+        # Số bit cho mỗi ô: 4 bit đến 4x4, rộng hơn cho 5x5 trở lên
+        self.bits = max(4, (self.n - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.goal_packed = self.pack(self.goal)
+
+        # Bảng nước đi theo vị trí ô trống: moves[x] = các cặp (mã nước đi, vị trí ô trống mới)
+        size = self.size
+        offsets = (-1, 1, -size, size)
+        self.moves = []
+        for x in range(self.n):
+            legal = []
+            for move in (LEFT, RIGHT, UP, DOWN):
+                if move == LEFT and x % size == 0:
+                    continue
+                if move == RIGHT and x % size == size - 1:
+                    continue
+                if move == UP and x < size:
+                    continue
+                if move == DOWN and x >= self.n - size:
+                    continue
+                legal.append((move, x + offsets[move]))
+            self.moves.append(tuple(legal))
+        # successors[x][nước đi cha]: như moves[x] nhưng bỏ nước đi ngược lại nước đi cha
+        self.successors = [
+            tuple(tuple(pair for pair in self.moves[x] if parent == NO_MOVE or pair[0] != INVERSE[parent])
+                  for parent in (LEFT, RIGHT, UP, DOWN, NO_MOVE))
+            for x in range(self.n)
+        ]
+
+    # Nén bàn cờ dạng list thành một số nguyên: ô ở vị trí i chiếm các bit [i*bits, (i+1)*bits)
+    def pack(self, board):
+        bits = self.bits
+        packed = 0
+        for pos in range(self.n - 1, -1, -1):
+            packed = (packed << bits) | board[pos]
+        return packed
+
+    # Giải nén số nguyên về bàn cờ dạng list
+    def unpack(self, packed):
+        bits = self.bits
+        mask = self.mask
+        board = []
+        for _ in range(self.n):
+            board.append(packed & mask)
+            packed >>= bits
+        return board
+
+_contexts = {}
+
+def get_context(size):
+    context = _contexts.get(size)
+    if context is None:
+        context = _contexts[size] = PuzzleContext(size)
+    return context
+
+def pack_board(board, size):
+    return get_context(size).pack(board)
+
+def unpack_board(packed, size):
+    return get_context(size).unpack(packed)
+
 
 class State:
-    def __init__(self, state, parent, action, depth, size):
+    __slots__ = ('state', 'parent', 'action', 'depth', 'size', 'goal', 'h', 'hdata', 'blank', 'context')
+
+    def __init__(self, state, parent, action, depth, size, blank=None):
         self.state = state
         self.parent = parent
-        self.action = action
+        self.action = action # Mã nước đi (LEFT/RIGHT/UP/DOWN), None ở nút gốc
         self.depth = depth
         self.size = size
-        # Goal state: [1,2,...,k*k - 1,0]
-        self.goal = list(range(1, size * size)) + [0]
-        
+        self.h = 0 # Giá trị heuristic, chỉ dùng cho các giải thuật có thông tin (IDA*, A*)
+        self.hdata = None # Dữ liệu riêng của heuristic để cập nhật tăng dần (ví dụ walking distance)
+        self.blank = state.index(0) if blank is None else blank # Vị trí ô trống
+        self.context = get_context(size)
+        self.goal = self.context.goal # Dùng chung cho mọi nút cùng kích thước
+
+    # Tạo nút gốc từ bàn cờ dạng list
+    @classmethod
+    def root(cls, given_state, size):
+        return cls(given_state, None, None, 0, size)
+
     def check(self):
         # Kiểm tra trạng thái hiện tại có phải là trạng thái mục tiêu hay chưa
         return self.state == self.goal
-    
-    # Xác định các hành động di chuyển hợp lệ cho trạng thái hiện tại
-    def available_moves(self, x): 
-        moves = ['Left', 'Right', 'Up', 'Down']
-        size = self.size
-        # Ô trống không thể đi sang trái
-        if x % size == 0:
-            moves.remove('Left')
-        # Ô trống không thể đi sang phải
-        if x % size == size - 1:
-            moves.remove('Right')
-        # Ô trống không thể đi lên trên
-        if x - size < 0:
-            moves.remove('Up')
-        # Ô trống không thể đi xuống dưới
-        if x + size >= size * size:
-            moves.remove('Down')
-            
-        # Loại bỏ hành động ngược lại hành động cha
-        if self.action == 'Left' and 'Right' in moves:
-            moves.remove('Right')
-        elif self.action == 'Right' and 'Left' in moves:
-            moves.remove('Left')
-        elif self.action == 'Up' and 'Down' in moves:
-            moves.remove('Down')
-        elif self.action == 'Down' and 'Up' in moves:
-            moves.remove('Up')
-            
-        return moves
-    
+
+    # Khoá chính xác của trạng thái (dùng cho tập visited)
+    def key(self):
+        return self.context.pack(self.state)
+
+    # Các nước đi hợp lệ (mã nước đi, vị trí ô trống mới), đã bỏ nước đi ngược lại nước đi cha
+    def available_moves(self):
+        return self.context.successors[self.blank][NO_MOVE if self.action is None else self.action]
+
     # Sinh ra các node con từ trạng thái hiện tại
     def expand(self):
-        x = self.state.index(0) # Tìm vị trí của ô trống (0) của trạng thái hiện tại
-        moves = self.available_moves(x) # Lấy danh sách các hành động hợp lệ cho trạng thái hiện tại
+        x = self.blank
         children = [] # Danh sách chứa các trạng thái được sinh ra từ trạng thái hiện tại
-        
-        for action in moves:
+
+        for move, target in self.available_moves():
             temp = self.state.copy() # Tạo bản sao của trạng thái hiện tại
-            
-            # Di chuyển các ô trống theo hành động tương ứng
-            if action == 'Left':
-                temp[x], temp[x - 1] = temp[x - 1], temp[x]
-            elif action == 'Right':
-                temp[x], temp[x + 1] = temp[x + 1], temp[x]
-            elif action == 'Up':
-                temp[x], temp[x - self.size] = temp[x - self.size], temp[x]
-            elif action == 'Down':
-                temp[x], temp[x + self.size] = temp[x + self.size], temp[x]
-            
+            # Đổi chỗ ô trống với ô số ở vị trí target
+            temp[x], temp[target] = temp[target], temp[x]
             # Tạo node con từ trạng thái đã được di chuyển
-            child = State(temp, self, action, self.depth + 1, self.size)
-            children.append(child)
-        
+            children.append(State(temp, self, move, self.depth + 1, self.size, target))
+
         return children
-    
-    # Hàm trả về lời giải
+
+    # Hàm trả về lời giải (chuyển mã nước đi thành 'Left'/'Right'/'Up'/'Down')
     def solution(self):
         solution = []
         path = self
         while path.parent is not None:
-            solution.append(path.action)
+            solution.append(ACTIONS[path.action])
             path = path.parent
         solution.reverse()
         return solution
+
+
+class PackedState:
+    """
+    Nút tìm kiếm gọn: bàn cờ được nén trong một số nguyên, dữ liệu theo kích thước nằm trong
+    PuzzleContext dùng chung. Có cùng giao diện với State nên các giải thuật chạy được trên cả hai.
+    """
+    __slots__ = ('board', 'parent', 'action', 'depth', 'context', 'h', 'hdata', 'blank')
+
+    def __init__(self, board, parent, action, depth, context, blank):
+        self.board = board
+        self.parent = parent
+        self.action = action
+        self.depth = depth
+        self.context = context
+        self.h = 0
+        self.hdata = None
+        self.blank = blank
+
+    @classmethod
+    def root(cls, given_state, size):
+        context = get_context(size)
+        return cls(context.pack(given_state), None, None, 0, context, given_state.index(0))
+
+    @property
+    def size(self):
+        return self.context.size
+
+    # Bàn cờ dạng list (dùng cho heuristic, in kết quả, UI)
+    @property
+    def state(self):
+        return self.context.unpack(self.board)
+
+    def check(self):
+        return self.board == self.context.goal_packed
+
+    def key(self):
+        return self.board
+
+    available_moves = State.available_moves
+    solution = State.solution
+
+    def expand(self):
+        context = self.context
+        bits = context.bits
+        mask = context.mask
+        board = self.board
+        x = self.blank
+        children = []
+        for move, target in self.available_moves():
+            tile = (board >> (target * bits)) & mask
+            # Đưa ô số ở target vào vị trí ô trống x
+            temp = board - (tile << (target * bits)) + (tile << (x * bits))
+            children.append(PackedState(temp, self, move, self.depth + 1, context, target))
+        return children
+
+
+# Truyền lời giải giữa các tiến trình: mỗi nước đi là mã 2 bit (LEFT..DOWN), 4 nước một byte,
+# cả lời giải được gửi trong một message thay vì từng chuỗi một
+_ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+def pack_moves(solution):
+    data = bytearray((len(solution) + 3) // 4)
+    for i, action in enumerate(solution):
+        data[i >> 2] |= _ACTION_CODES[action] << ((i & 3) << 1)
+    return bytes(data)
+
+def iter_moves(data, count, start=0):
+    # Giải nén dần từng nước đi (dạng chuỗi như solution()), bắt đầu từ nước thứ start
+    for i in range(start, count):
+        yield ACTIONS[(data[i >> 2] >> ((i & 3) << 1)) & 3]
+
+def unpack_moves(data, count):
+    return list(iter_moves(data, count))
+
+def put_solution(solution_queue, solution, elapsed_time, nodes_visited, status=None):
+    """
+    Gửi lời giải và số đo qua Queue trong một message: ('solution', số nước đi (-1 nếu không có lời
+    giải), dữ liệu nén, (thời gian, số nút đã duyệt, trạng thái như SearchResult.status)).
+    """
+    if status is None:
+        status = 'solved' if solution is not None else 'exhausted'
+    if solution is None:
+        solution_queue.put(('solution', -1, b'', (elapsed_time, nodes_visited, status)))
+    else:
+        solution_queue.put(('solution', len(solution), pack_moves(solution), (elapsed_time, nodes_visited, status)))
+
+
+class ManhattanLinearConflict:
+    """
+    Heuristic Manhattan + linear conflict (chấp nhận được - không bao giờ đánh giá cao hơn
+    chi phí thật), được cập nhật tăng dần theo từng nước đi thay vì tính lại toàn bộ bàn cờ.
+    """
+    def __init__(self, size):
+        self.size = size
+        # Hàng và cột mục tiêu của từng ô số
+        self.goal_row = [0] * (size * size)
+        self.goal_col = [0] * (size * size)
+        for tile in range(1, size * size):
+            self.goal_row[tile] = (tile - 1) // size
+            self.goal_col[tile] = (tile - 1) % size
+
+    def manhattan(self, board):
+        size = self.size
+        total = 0
+        for pos, tile in enumerate(board):
+            if tile:
+                total += abs(pos // size - self.goal_row[tile]) + abs(pos % size - self.goal_col[tile])
+        return total
+
+    # Số ô cần bỏ ra khỏi một dãy để các ô còn lại đúng thứ tự (độ dài dãy - LIS), nhân 2
+    @staticmethod
+    def _line_conflicts(targets):
+        if len(targets) < 2:
+            return 0
+        tails = []
+        for t in targets:
+            lo, hi = 0, len(tails)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if tails[mid] < t:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo == len(tails):
+                tails.append(t)
+            else:
+                tails[lo] = t
+        return 2 * (len(targets) - len(tails))
+
+    def row_conflicts(self, board, row):
+        size = self.size
+        targets = []
+        for pos in range(row * size, row * size + size):
+            tile = board[pos]
+            if tile and self.goal_row[tile] == row:
+                targets.append(self.goal_col[tile])
+        return self._line_conflicts(targets)
+
+    def col_conflicts(self, board, col):
+        size = self.size
+        targets = []
+        for pos in range(col, size * size, size):
+            tile = board[pos]
+            if tile and self.goal_col[tile] == col:
+                targets.append(self.goal_row[tile])
+        return self._line_conflicts(targets)
+
+    def evaluate(self, board):
+        total = self.manhattan(board)
+        for line in range(self.size):
+            total += self.row_conflicts(board, line) + self.col_conflicts(board, line)
+        return total
+
+    # Gán giá trị heuristic cho nút gốc
+    def initialize(self, node):
+        node.h = self.evaluate(node.state)
+
+    # Tính heuristic của nút con từ nút cha: chỉ ô vừa di chuyển và hàng/cột bị ảnh hưởng thay đổi
+    def update(self, parent, child):
+        size = self.size
+        dst = parent.blank  # Vị trí mới của ô số (ô trống cũ)
+        src = child.blank   # Vị trí cũ của ô số (ô trống mới)
+        board = child.state
+        tile = board[dst]
+        h = parent.h
+        h += abs(dst // size - self.goal_row[tile]) + abs(dst % size - self.goal_col[tile])
+        h -= abs(src // size - self.goal_row[tile]) + abs(src % size - self.goal_col[tile])
+        if src // size == dst // size:
+            # Di chuyển ngang: thứ tự trong hàng không đổi, chỉ hai cột bị ảnh hưởng
+            for col in (src % size, dst % size):
+                h += self.col_conflicts(board, col) - self.col_conflicts(parent.state, col)
+        else:
+            # Di chuyển dọc: chỉ hai hàng bị ảnh hưởng
+            for row in (src // size, dst // size):
+                h += self.row_conflicts(board, row) - self.row_conflicts(parent.state, row)
+        child.h = h
+
+
+# Các heuristic chọn được theo tên (--heuristic); bảng mẫu và bảng walking distance cũng nạp được từ file (--pdb)
+HEURISTICS = ('linear-conflict', 'walking-distance')
+
+def make_heuristic(name, size):
+    if name == 'linear-conflict':
+        return ManhattanLinearConflict(size)
+    if name == 'walking-distance':
+        import walking_distance
+        return walking_distance.get(size)
+    raise ValueError(f"unknown heuristic {name!r}, choose from {', '.join(HEURISTICS)}")
+
+def load_heuristic(path):
+    # Nhận dạng loại bảng theo magic ở đầu file
+    import walking_distance
+    with open(path, 'rb') as file:
+        magic = file.read(len(walking_distance.MAGIC))
+    if magic == walking_distance.MAGIC:
+        return walking_distance.WalkingDistance.load(path)
+    import pattern_db
+    return pattern_db.PatternDatabase.load(path)
+
+@contextmanager
+def replace_file(path):
+    """
+    Ghi file bảng qua một file tạm trong cùng thư mục rồi os.replace vào chỗ path: tiến trình đang
+    ánh xạ (mmap) file cũ vẫn giữ nguyên các trang của nó, tiến trình mở file sau đó luôn thấy một
+    bảng hoàn chỉnh, kể cả khi nhiều tiến trình cùng sinh bảng lần đầu.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            yield file
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
     
 
+# Số nút duyệt giữa hai lần giải thuật gọi progress.report (giữ chi phí theo dõi không đáng kể)
+PROGRESS_CHECK = 4096
+# Ước lượng số byte của một nút trong biên và của một khoá trong tập đã duyệt (dùng cho memory_mb)
+NODE_BYTES = 250
+KEY_BYTES = 90
+
+class ProgressSink:
+    """
+    Nơi nhận các sự kiện tiến trình tìm kiếm; lớp con cài đặt emit(event), event là một dict.
+    """
+    def emit(self, event):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class QueueSink(ProgressSink):
+    """
+    Gửi sự kiện qua một multiprocessing.Queue dưới dạng ('progress', event), ví dụ metrics_queue của UI.
+    """
+    def __init__(self, queue):
+        self.queue = queue
+
+    def emit(self, event):
+        self.queue.put(('progress', event))
+
+class LogSink(ProgressSink):
+    """
+    Ghi mỗi sự kiện thành một dòng JSON qua logging (mặc định logger 'npuzzle.progress').
+    """
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger('npuzzle.progress')
+        self.level = level
+
+    def emit(self, event):
+        self.logger.log(self.level, json.dumps(event))
+
+class Progress:
+    """
+    Bộ theo dõi tiến trình truyền vào các giải thuật qua tham số progress. Giải thuật gọi report()
+    sau mỗi PROGRESS_CHECK nút; sự kiện chỉ được gửi tới các sink khi đã qua ít nhất interval giây
+    kể từ lần gửi trước.
+    """
+    def __init__(self, algorithm, sinks=(), interval=0.5):
+        self.algorithm = algorithm
+        self.sinks = list(sinks)
+        self.interval = interval
+        self.start_time = time()
+        self.last_report = self.start_time
+
+    def report(self, nodes, depth=None, bound=None, frontier=0, visited=0, done=False):
+        now = time()
+        if not done and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        elapsed = now - self.start_time
+        event = {
+            'algorithm': self.algorithm,
+            'elapsed': round(elapsed, 3),
+            'nodes': nodes,
+            'nodes_per_second': round(nodes / elapsed, 1) if elapsed else 0.0,
+            'depth': depth,
+            'bound': bound,
+            'frontier': frontier,
+            'visited': visited,
+            'memory_mb': round((frontier * NODE_BYTES + visited * KEY_BYTES) / (1024 * 1024), 2),
+            'done': done,
+        }
+        for sink in self.sinks:
+            sink.emit(event)
+
+
+class SearchResult(tuple):
+    """
+    Kết quả của một giải thuật. Vẫn là cặp (lời giải, số nút đã duyệt) như trước nên cách gọi
+    "solution, nodes_visited = IDA_star(...)" không đổi, kèm thêm các thuộc tính:
+    status ('solved', 'exhausted' khi đã duyệt hết trong giới hạn độ sâu, 'timeout', 'budget' khi
+    vượt số nút hoặc bộ nhớ, 'cancelled'), elapsed (giây), depth (độ sâu đang duyệt khi dừng, hoặc
+    độ dài lời giải) và bound (ngưỡng f / giới hạn độ sâu đã đạt, nếu giải thuật có).
+    Nếu lời giải đã được rút ngắn (solve(..., shorten=True)), original_length là độ dài trước khi rút ngắn.
+    """
+    def __new__(cls, solution, nodes, status=None, elapsed=0.0, depth=None, bound=None, original_length=None):
+        result = super().__new__(cls, (solution, nodes))
+        result.status = status or ('solved' if solution is not None else 'exhausted')
+        result.elapsed = elapsed
+        result.depth = len(solution) if depth is None and solution is not None else depth
+        result.bound = bound
+        result.original_length = original_length
+        return result
+
+    def __getnewargs__(self):
+        return (self[0], self[1], self.status, self.elapsed, self.depth, self.bound, self.original_length)
+
+    @property
+    def solution(self):
+        return self[0]
+
+    @property
+    def nodes(self):
+        return self[1]
+
+    def to_dict(self):
+        return {'status': self.status, 'solution': self.solution, 'nodes': self.nodes,
+                'elapsed': round(self.elapsed, 4), 'depth': self.depth, 'bound': self.bound,
+                'original_length': self.original_length}
+
+class CancellationToken:
+    """
+    Cờ huỷ dùng chung giữa các tiến trình (multiprocessing.Event): người gọi gọi cancel(), giải thuật
+    dừng ở lần kiểm tra giới hạn kế tiếp và trả về kết quả với status='cancelled'. context là ngữ cảnh
+    multiprocessing của các tiến trình sẽ nhận token (ví dụ forkserver), mặc định là ngữ cảnh chung.
+    """
+    def __init__(self, context=None):
+        self.event = context.Event() if context is not None else Event()
+
+    def cancel(self):
+        self.event.set()
+
+    def reset(self):
+        self.event.clear()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+class SearchLimits:
+    """
+    Giới hạn của một lần giải, được giải thuật kiểm tra sau mỗi PROGRESS_CHECK nút (cùng chỗ gọi
+    progress.report): time_limit (giây, tính từ lúc tạo đối tượng), node_limit, memory_mb (ước lượng
+    như Progress từ số nút trong biên và số khoá đã duyệt) và token (CancellationToken).
+    Giống Progress, mỗi lần giải dùng một đối tượng mới. Vì chỉ được so sánh tại các điểm kiểm tra,
+    node_limit là giới hạn gần đúng: giải thuật có thể duyệt thêm khoảng PROGRESS_CHECK nút (BFS NumPy
+    so sánh chính xác, IDA* song song chỉ cộng số nút sau mỗi cây con).
+    """
+    def __init__(self, time_limit=None, node_limit=None, memory_mb=None, token=None):
+        self.start_time = time()
+        self.deadline = None if time_limit is None else self.start_time + time_limit
+        self.node_limit = node_limit
+        self.memory_bytes = None if memory_mb is None else memory_mb * 1024 * 1024
+        self.token = token
+
+    def remaining(self):
+        # Số giây còn lại trước hạn, None nếu không giới hạn thời gian
+        return None if self.deadline is None else max(0.0, self.deadline - time())
+
+    def check(self, nodes=0, frontier=0, visited=0):
+        """
+        Trả về lý do phải dừng ('cancelled', 'timeout', 'budget') hoặc None nếu được tiếp tục.
+        """
+        if self.token is not None and self.token.cancelled:
+            return 'cancelled'
+        if self.deadline is not None and time() > self.deadline:
+            return 'timeout'
+        if self.node_limit is not None and nodes > self.node_limit:
+            return 'budget'
+        if self.memory_bytes is not None and frontier * NODE_BYTES + visited * KEY_BYTES > self.memory_bytes:
+            return 'budget'
+        return None
+
+
+class TranspositionTable:
+    """
+    Bảng chuyển vị có kích thước cố định, giữ qua các vòng lặp của IDS. Mỗi ô lưu khoá trạng thái,
+    độ sâu nông nhất đã gặp và vòng lặp đã ghi. Khi hai trạng thái tranh cùng một ô, giữ lại mục
+    nông hơn (cắt được cây con lớn hơn), trừ khi mục cũ thuộc vòng lặp trước.
+    """
+    def __init__(self, capacity=1000003):
+        self.capacity = capacity
+        self.keys = [None] * capacity
+        self.depths = array('H', bytes(2 * capacity))
+        self.iterations = array('H', bytes(2 * capacity))
+        self.stored = 0
+        self.replacements = 0
+        self.rejections = 0
+
+    def __len__(self):
+        return self.stored
+
+    # Số nút bị quên do bảng đầy: mục cũ bị ghi đè hoặc nút mới không được ghi
+    @property
+    def forgotten(self):
+        return self.replacements + self.rejections
+
+    # Trả về True nếu nút ở độ sâu depth có thể bỏ qua; ngược lại ghi nhận nút vào bảng
+    def prune(self, key, depth, iteration):
+        slot = hash(key) % self.capacity
+        old_key = self.keys[slot]
+        if old_key == key:
+            old_depth = self.depths[slot]
+            # Đã gặp ở độ sâu nông hơn, hoặc đã duyệt ở cùng độ sâu trong vòng lặp này
+            if old_depth < depth or (old_depth == depth and self.iterations[slot] == iteration):
+                return True
+        elif old_key is None:
+            self.stored += 1
+        elif self.depths[slot] < depth and self.iterations[slot] == iteration:
+            # Mục cũ nông hơn và còn mới: giữ lại, không ghi nút này
+            self.rejections += 1
+            return False
+        else:
+            self.replacements += 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.iterations[slot] = iteration
+        return False
+
+
 # Hàm thực hiện giải thuật DFS
-def DFS(given_state, size):
+def DFS(given_state, size, node_type=State, progress=None, visited=None, limits=None):
+    start_time = time()
     # Khởi tạo nút gốc
-    root = State(given_state, None, None, 0, size)
+    root = node_type.root(given_state, size)
         
     # Kiểm tra xem trạng thái hiện tại có phải là trạng thái mục tiêu hay không, nếu phải thì trả về lời giải bài toán
     if root.check():
-        return root.solution(), 0
+        return SearchResult(root.solution(), 0, elapsed=time() - start_time)
         
-    # Tạo ngăn xếp (stack) cho các nút sẽ duyệt
+    # Tạo ngăn xếp (stack) cho các nút sẽ duyệt; visited là tập đã duyệt (visited.py) hoặc set() mặc định
     stack = [root]
-    visited = set()    
+    visited = set() if visited is None else visited
         
     # Duyệt qua stack
     while stack:
         current_node = stack.pop()
         if current_node.check():
-            return current_node.solution(), len(visited)
-        state_hash = hash(tuple(current_node.state))
-        visited.add(state_hash)
+            return SearchResult(current_node.solution(), len(visited), elapsed=time() - start_time)
+        state_key = current_node.key()
+        visited.add(state_key)
+        if len(visited) % PROGRESS_CHECK == 0:
+            if progress is not None:
+                progress.report(len(visited), current_node.depth, frontier=len(stack), visited=len(visited))
+            if limits is not None:
+                status = limits.check(len(visited), len(stack), len(visited))
+                if status is not None:
+                    return SearchResult(None, len(visited), status, time() - start_time, current_node.depth)
         
         # Tạo các nút con
         children = current_node.expand() 
         
         for child in children:
-            child_hash = hash(tuple(child.state))
+            child_key = child.key()
             #kiểm tra xem nút này đã duyệt hay chưa, nếu chưa thì thêm vào stack
-            if child_hash not in visited:
+            if child_key not in visited:
                 stack.append(child)
     
     #trả về không tìm thấy lời giải và số nút đã duyệt  
-    return None, len(visited)
+    return SearchResult(None, len(visited), elapsed=time() - start_time)
 
-def DFS_with_steps(given_state, size, solution_queue):
+def DFS_with_steps(given_state, size, solution_queue, node_type=State, visited=None, limits=None):
     """
     Giải thuật DFS nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
     """
-    # Khởi tạo nút gốc
-    root = State(given_state, None, None, 0, size)
-        
-    # Kiểm tra xem trạng thái hiện tại có phải là trạng thái mục tiêu hay không, nếu phải thì trả về lời giải bài toán
-    if root.check():
-        solution = root.solution()
-        for step in solution:
-            solution_queue.put(step)
-        solution_queue.put("DONE")
-        return 0, 0
-        
-    # Tạo ngăn xếp (stack) cho các nút sẽ duyệt
-    stack = [root]
-    visited = set()   
-    nodes_visited = 0 
     start_time = time()
-    solution = []
-        
-    # Duyệt qua stack
-    while stack:
-        current_node = stack.pop()
-        nodes_visited += 1
-
-        if current_node.check():
-            solution = current_node.solution()
-            for step in solution:
-                solution_queue.put(step)
-            solution_queue.put("DONE")
-            elapsed_time = time() - start_time
-            solution.append(solution)
-            return elapsed_time, nodes_visited, len(solution) - 1
-        
-        state_hash = hash(tuple(current_node.state))
-        visited.add(state_hash)
-        
-        # Tạo các nút con
-        children = current_node.expand() 
-        
-        for child in children:
-            child_hash = hash(tuple(child.state))
-            #kiểm tra xem nút này đã duyệt hay chưa, nếu chưa thì thêm vào stack
-            if child_hash not in visited:
-                stack.append(child)
-    
-    #trả về không tìm thấy lời giải và số nút đã duyệt 
-    solution_queue.put("DONE")
-    elapsed_time = time() - start_time 
-    return None, elapsed_time, nodes_visited, len(solution) - 1
+    result = DFS(given_state, size, node_type, visited=visited, limits=limits)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
 
 # Hàm hiện thực giải thuật DLS (Giải thuật DFS có giới hạn độ sâu tìm kiếm)
-def DLS(given_state, size, max_depth):
+def DLS(given_state, size, max_depth, node_type=State, visited=None, limits=None):
+    start_time = time()
     # Khởi tạo nút gốc
-    root = State(given_state, None, None, 0, size)
+    root = node_type.root(given_state, size)
         
     # Kiểm tra xem trạng thái hiện tại có phải là trạng thái mục tiêu hay không, nếu phải thì trả về lời giải bài toán
     if root.check():
-        return root.solution(), 0
+        return SearchResult(root.solution(), 0, elapsed=time() - start_time)
         
-    # Tạo ngăn xếp (stack) cho các nút sẽ duyệt
+    # Tạo ngăn xếp (stack) cho các nút sẽ duyệt; visited là tập đã duyệt (visited.py) hoặc set() mặc định
     stack = [root]
-    visited = set()    
+    visited = set() if visited is None else visited
         
     # Duyệt qua stack
     while stack:
         current_node = stack.pop()
         if current_node.check():
-            return current_node.solution(), len(visited)
+            return SearchResult(current_node.solution(), len(visited), elapsed=time() - start_time, bound=max_depth)
         depth = current_node.depth 
-        state_hash = hash(tuple(current_node.state))
-        visited.add(state_hash)
+        state_key = current_node.key()
+        visited.add(state_key)
+        if limits is not None and len(visited) % PROGRESS_CHECK == 0:
+            status = limits.check(len(visited), len(stack), len(visited))
+            if status is not None:
+                return SearchResult(None, len(visited), status, time() - start_time, depth, max_depth)
         
         if depth >= max_depth:
             continue
@@ -195,52 +662,535 @@ def DLS(given_state, size, max_depth):
         children = current_node.expand() 
         
         for child in children:
-            child_hash = hash(tuple(child.state))
+            child_key = child.key()
             #kiểm tra xem nút này đã duyệt hay chưa, nếu chưa thì thêm vào stack
-            if child_hash not in visited:
+            if child_key not in visited:
                 stack.append(child)
     
     #trả về không tìm thấy lời giải và số nút đã duyệt  
-    return None, len(visited)
+    return SearchResult(None, len(visited), elapsed=time() - start_time, bound=max_depth)
 
 # Hàm thực hiện giải thuật IDS (Iterative Deepening Search cải tiến từ DLS)
-def IDS(given_state, size, max_depth):
-    # Tăng độ sâu tìm kiếm từ 1 -> max_depth
-    for depth in range(1 ,max_depth + 1):
-        solution, nodes_visited = DLS(given_state, size, depth)
-        # Nếu tại độ sâu depth có lời giải bài toán, trả về lời giải đó và kết thúc hàm
-        if solution is not None:
-            return solution, nodes_visited
-    return None, nodes_visited
-
-def IDS_with_steps(given_state, size, max_depth, solution_queue):
+def IDS(given_state, size, max_depth, node_type=State, table_size=1000003, iteration_nodes=None, progress=None,
+        limits=None):
     """
-    Giải thuật IDS nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    Nút gốc và bảng chuyển vị được giữ lại giữa các vòng lặp, nên một trạng thái chỉ bị cắt khi
+    nó đã được gặp ở độ sâu nông hơn. Nếu truyền list iteration_nodes, số nút duyệt ở mỗi
+    vòng lặp được thêm vào list đó.
     """
     start_time = time()
+    root = node_type.root(given_state, size)
+    table = TranspositionTable(table_size)
     total_nodes_visited = 0
-    solution = []
 
+    # Tăng độ sâu tìm kiếm từ 1 -> max_depth
     for depth in range(1, max_depth + 1):
-        solution, nodes_visited = DLS(given_state, size, depth)
+        nodes_visited = 0
+        stack = [root]
+        while stack:
+            current_node = stack.pop()
+            if current_node.check():
+                total_nodes_visited += nodes_visited
+                if iteration_nodes is not None:
+                    iteration_nodes.append(nodes_visited)
+                return SearchResult(current_node.solution(), total_nodes_visited, elapsed=time() - start_time,
+                                    bound=depth)
+            if table.prune(current_node.key(), current_node.depth, depth):
+                continue
+            nodes_visited += 1
+            if nodes_visited % PROGRESS_CHECK == 0:
+                if progress is not None:
+                    progress.report(total_nodes_visited + nodes_visited, current_node.depth, depth,
+                                    len(stack), len(table))
+                if limits is not None:
+                    status = limits.check(total_nodes_visited + nodes_visited, len(stack), len(table))
+                    if status is not None:
+                        return SearchResult(None, total_nodes_visited + nodes_visited, status, time() - start_time,
+                                            current_node.depth, depth)
+            if current_node.depth < depth:
+                stack.extend(current_node.expand())
+
         total_nodes_visited += nodes_visited
-        if solution is not None:
-            # Gửi từng bước di chuyển qua Queue
-            for step in solution:
-                solution_queue.put(step)
-            solution_queue.put("DONE")
-            elapsed_time = time() - start_time
-            solution.append(solution)
-            return elapsed_time, total_nodes_visited, len(solution) - 1
+        if iteration_nodes is not None:
+            iteration_nodes.append(nodes_visited)
+    return SearchResult(None, total_nodes_visited, elapsed=time() - start_time, bound=max_depth)
+
+def IDS_with_steps(given_state, size, max_depth, solution_queue, node_type=State, limits=None):
+    """
+    Giải thuật IDS nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    """
+    start_time = time()
+    result = IDS(given_state, size, max_depth, node_type, limits=limits)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
+
+
+# Hàm thực hiện giải thuật IDA* (IDS với ngưỡng f = g + h thay vì độ sâu)
+def IDA_star(given_state, size, max_depth=80, heuristic=None, node_type=State, progress=None, limits=None):
+    start_time = time()
+    if heuristic is None:
+        heuristic = ManhattanLinearConflict(size)
+    root = node_type.root(given_state, size)
+    heuristic.initialize(root)
+    
+    bound = root.h
+    nodes_visited = 0
+    # Tăng ngưỡng f sau mỗi vòng lên giá trị f nhỏ nhất đã vượt ngưỡng
+    while bound <= max_depth:
+        next_bound = None
+        stack = [root]
+        while stack:
+            current_node = stack.pop()
+            nodes_visited += 1
+            if current_node.check():
+                return SearchResult(current_node.solution(), nodes_visited, elapsed=time() - start_time, bound=bound)
+            if nodes_visited % PROGRESS_CHECK == 0:
+                if progress is not None:
+                    progress.report(nodes_visited, current_node.depth, bound, len(stack))
+                if limits is not None:
+                    status = limits.check(nodes_visited, len(stack))
+                    if status is not None:
+                        return SearchResult(None, nodes_visited, status, time() - start_time, current_node.depth, bound)
+            
+            children = current_node.expand()
+            promising = []
+            for child in children:
+                heuristic.update(current_node, child)
+                f = child.depth + child.h
+                if f > bound:
+                    if next_bound is None or f < next_bound:
+                        next_bound = f
+                else:
+                    promising.append(child)
+            # Nút con có h nhỏ nhất được duyệt trước
+            promising.sort(key=lambda node: node.h, reverse=True)
+            stack.extend(promising)
+        
+        if next_bound is None:
+            break
+        bound = next_bound
     
-    solution_queue.put("DONE")
+    return SearchResult(None, nodes_visited, elapsed=time() - start_time, bound=bound)
+
+def IDA_star_with_steps(given_state, size, max_depth, solution_queue, node_type=State, limits=None):
+    """
+    Giải thuật IDA* nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    """
+    start_time = time()
+    result = IDA_star(given_state, size, max_depth, node_type=node_type, limits=limits)
+    solution, nodes_visited = result
     elapsed_time = time() - start_time
-    return elapsed_time, total_nodes_visited, len(solution) - 1
+    put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
 
+# Số byte cố định của một ô trong TranspositionTable (con trỏ khoá + độ sâu + vòng lặp)
+TABLE_SLOT_BYTES = 12
 
-def readInput(filename):
+# Hàm thực hiện IDA* có giới hạn bộ nhớ: IDA* kèm bảng chuyển vị có kích thước cố định tính từ memory_mb
+def memory_bounded_IDA_star(given_state, size, max_depth=80, memory_mb=64, heuristic=None, node_type=State,
+                            progress=None, table_stats=None, limits=None):
+    """
+    Ngoài ngăn xếp O(độ sâu) của IDA*, bộ nhớ chỉ dùng cho bảng chuyển vị; số ô của bảng được tính
+    sao cho bảng (kể cả các khoá) không vượt quá memory_mb MB. Khi bảng đầy, các nút bị quên và có
+    thể được duyệt lại; memory_mb=0 tương đương IDA* thường. Nếu truyền dict table_stats, kích thước
+    bảng và số nút đã bị quên được ghi vào dict đó.
+    """
+    start_time = time()
+    if heuristic is None:
+        heuristic = ManhattanLinearConflict(size)
+    root = node_type.root(given_state, size)
+    heuristic.initialize(root)
+    entry_bytes = TABLE_SLOT_BYTES + sys.getsizeof(root.key())
+    capacity = int(memory_mb * 1024 * 1024 // entry_bytes)
+    table = TranspositionTable(capacity) if capacity else None
+
+    bound = root.h
+    nodes_visited = 0
+    iteration = 0
+    solution = None
+    status = None
+    depth = None
+    while solution is None and bound <= max_depth:
+        iteration += 1
+        next_bound = None
+        stack = [root]
+        while stack:
+            current_node = stack.pop()
+            # Bỏ qua trạng thái đã gặp ở độ sâu nông hơn (hoặc đã duyệt trong vòng này)
+            if table is not None and table.prune(current_node.key(), current_node.depth, iteration):
+                continue
+            nodes_visited += 1
+            if current_node.check():
+                solution = current_node.solution()
+                break
+            if nodes_visited % PROGRESS_CHECK == 0:
+                if progress is not None:
+                    progress.report(nodes_visited, current_node.depth, bound, len(stack),
+                                    len(table) if table is not None else 0)
+                if limits is not None:
+                    status = limits.check(nodes_visited, len(stack), len(table) if table is not None else 0)
+                    if status is not None:
+                        depth = current_node.depth
+                        break
+
+            promising = []
+            for child in current_node.expand():
+                heuristic.update(current_node, child)
+                f = child.depth + child.h
+                if f > bound:
+                    if next_bound is None or f < next_bound:
+                        next_bound = f
+                else:
+                    promising.append(child)
+            promising.sort(key=lambda node: node.h, reverse=True)
+            stack.extend(promising)
+
+        if status is not None or next_bound is None:
+            break
+        bound = next_bound
+
+    if table_stats is not None:
+        table_stats.update(capacity=capacity, stored=len(table) if table is not None else 0,
+                           forgotten=table.forgotten if table is not None else 0,
+                           memory_mb=round(capacity * entry_bytes / (1024 * 1024), 2))
+    return SearchResult(solution, nodes_visited, status, time() - start_time, depth, bound)
+
+# Hàm thực hiện giải thuật A* (hàng đợi ưu tiên theo f = g + h)
+def A_star(given_state, size, heuristic=None, node_type=State, progress=None, limits=None):
+    start_time = time()
+    if heuristic is None:
+        heuristic = ManhattanLinearConflict(size)
+    root = node_type.root(given_state, size)
+    heuristic.initialize(root)
+    
+    counter = 0 # Phá thế hoà giữa các nút có cùng f, h
+    frontier = [(root.h, root.h, counter, root)]
+    best_depth = {root.key(): 0}
+    nodes_visited = 0
+    
+    while frontier:
+        _, _, _, current_node = heapq.heappop(frontier)
+        state_key = current_node.key()
+        # Bỏ qua bản sao cũ nếu nút này đã được tìm thấy bằng đường đi ngắn hơn
+        if best_depth[state_key] < current_node.depth:
+            continue
+        nodes_visited += 1
+        if current_node.check():
+            return SearchResult(current_node.solution(), nodes_visited, elapsed=time() - start_time,
+                                bound=current_node.depth)
+        if nodes_visited % PROGRESS_CHECK == 0:
+            if progress is not None:
+                progress.report(nodes_visited, current_node.depth, current_node.depth + current_node.h,
+                                len(frontier), len(best_depth))
+            if limits is not None:
+                status = limits.check(nodes_visited, len(frontier), len(best_depth))
+                if status is not None:
+                    return SearchResult(None, nodes_visited, status, time() - start_time, current_node.depth,
+                                        current_node.depth + current_node.h)
+        
+        for child in current_node.expand():
+            child_key = child.key()
+            if child_key in best_depth and best_depth[child_key] <= child.depth:
+                continue
+            best_depth[child_key] = child.depth
+            heuristic.update(current_node, child)
+            counter += 1
+            heapq.heappush(frontier, (child.depth + child.h, child.h, counter, child))
+    
+    return SearchResult(None, nodes_visited, elapsed=time() - start_time)
+
+def A_star_with_steps(given_state, size, solution_queue, node_type=State, limits=None):
+    """
+    Giải thuật A* nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    """
+    start_time = time()
+    result = A_star(given_state, size, node_type=node_type, limits=limits)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
+
+# Hàm thực hiện tìm kiếm hai chiều: BFS từ trạng thái ban đầu và BFS ngược từ trạng thái mục tiêu
+def bidirectional_search(given_state, size, max_depth=80, node_type=State, progress=None, limits=None):
+    start_time = time()
+    FORWARD, BACKWARD = 0, 1
+    start = node_type.root(given_state, size)
+    goal = node_type.root(get_context(size).goal, size)
+    if start.check():
+        return SearchResult(start.solution(), 0, elapsed=time() - start_time)
+
+    # Chỉ mục băm dùng chung cho cả hai phía: khoá trạng thái -> (phía, nút)
+    index = {start.key(): (FORWARD, start), goal.key(): (BACKWARD, goal)}
+    frontiers = [[start], [goal]]
+    depths = [0, 0]
+    nodes_visited = 0
+
+    while frontiers[FORWARD] and frontiers[BACKWARD] and depths[FORWARD] + depths[BACKWARD] < max_depth:
+        # Mở rộng trọn một tầng của phía có biên nhỏ hơn
+        side = FORWARD if len(frontiers[FORWARD]) <= len(frontiers[BACKWARD]) else BACKWARD
+        best = None
+        next_frontier = []
+        for current_node in frontiers[side]:
+            nodes_visited += 1
+            if nodes_visited % PROGRESS_CHECK == 0:
+                frontier_size = len(frontiers[FORWARD]) + len(frontiers[BACKWARD]) + len(next_frontier)
+                if progress is not None:
+                    progress.report(nodes_visited, depths[FORWARD] + depths[BACKWARD], None, frontier_size, len(index))
+                if limits is not None:
+                    status = limits.check(nodes_visited, frontier_size, len(index))
+                    if status is not None:
+                        return SearchResult(None, nodes_visited, status, time() - start_time,
+                                            depths[FORWARD] + depths[BACKWARD])
+            for child in current_node.expand():
+                child_key = child.key()
+                seen = index.get(child_key)
+                if seen is None:
+                    index[child_key] = (side, child)
+                    next_frontier.append(child)
+                elif seen[0] != side:
+                    # Hai biên gặp nhau: giữ cách nối có tổng độ sâu nhỏ nhất trong tầng này
+                    if best is None or child.depth + seen[1].depth < best[0].depth + best[1].depth:
+                        best = (child, seen[1])
+        frontiers[side] = next_frontier
+        depths[side] += 1
+
+        if best is not None:
+            forward_node, backward_node = best if side == FORWARD else best[::-1]
+            # Đường đi ngược: đảo thứ tự và đổi chiều từng nước đi
+            path = forward_node.solution()
+            node = backward_node
+            while node.parent is not None:
+                path.append(ACTIONS[INVERSE[node.action]])
+                node = node.parent
+            return SearchResult(path, nodes_visited, elapsed=time() - start_time)
+
+    return SearchResult(None, nodes_visited, elapsed=time() - start_time, depth=depths[FORWARD] + depths[BACKWARD])
+
+def bidirectional_search_with_steps(given_state, size, max_depth, solution_queue, node_type=State, limits=None):
+    """
+    Tìm kiếm hai chiều nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    """
+    start_time = time()
+    result = bidirectional_search(given_state, size, max_depth, node_type, limits=limits)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
+
+# BFS vector hoá bằng NumPy (vector_bfs.py), chỉ nạp numpy khi được chọn
+def numpy_BFS(given_state, size, max_depth=80, progress=None, limits=None, **options):
+    import vector_bfs
+    return vector_bfs.BFS(given_state, size, max_depth, progress, limits)
+
+# IDA* song song trên nhiều tiến trình (parallel_search.py); bảng PDB được truyền qua đường dẫn file.
+# processes là số tiến trình con (mặc định bằng số CPU)
+def parallel_IDA(given_state, size, max_depth=80, heuristic=None, worker_nodes=None, progress=None, limits=None,
+                 processes=None, **options):
+    import parallel_search
+    return parallel_search.parallel_IDA_star(given_state, size, max_depth, processes,
+                                             pdb=getattr(heuristic, 'path', None), worker_nodes=worker_nodes,
+                                             progress=progress, limits=limits)
+
+# Giải thuật rút gọn hàng/cột cho bàn cờ lớn (reduction.py), không tối ưu và không giới hạn độ sâu
+def reduction_search(given_state, size, max_depth=80, weight=2.0, limits=None, **options):
+    import reduction
+    return reduction.reduction_solve(given_state, size, weight, limits)
+
+# Bảng các giải thuật có thể chọn từ dòng lệnh
+SOLVERS = {
+    'dfs': lambda given_state, size, max_depth, **options: DFS(given_state, size, **options),
+    'ids': IDS,
+    'idastar': IDA_star,
+    'mbida': memory_bounded_IDA_star,
+    'astar': lambda given_state, size, max_depth, **options: A_star(given_state, size, **options),
+    'bidir': bidirectional_search,
+    'bfs': numpy_BFS,
+    'pidastar': parallel_IDA,
+    'reduce': reduction_search,
+    'portfolio': lambda given_state, size, max_depth, **options: portfolio(given_state, size, max_depth=max_depth, **options)[0],
+}
+
+# Phần khoá cache mô tả các tuỳ chọn làm thay đổi lời giải: trọng số của reduce, tập giải thuật đua
+# của portfolio khi nhận mọi lời giải. Các giải thuật tối ưu cho cùng độ dài với mọi tuỳ chọn
+def _cache_variant(algorithm, options):
+    if algorithm == 'reduce':
+        return f"weight={float(options.get('weight', 2.0))}"
+    if algorithm == 'portfolio' and options.get('quality', 'optimal') == 'any':
+        return "any:" + ','.join(options.get('algorithms', ('idastar', 'bidir', 'ids')))
+    return ''
+
+# Điểm vào chung cho mọi giải thuật; nếu có cache (solution_cache.SolutionCache) thì tra cứu trước khi giải.
+# Bàn cờ 3x3 với giải thuật tối ưu được giải bằng bảng khoảng cách đầy đủ (eight_puzzle.py) trừ khi use_table=False.
+# Nếu có progress (Progress), sự kiện cuối cùng (done=True) được gửi khi giải xong.
+# limits (SearchLimits) giới hạn thời gian/số nút/bộ nhớ và cho phép huỷ; kết quả luôn là SearchResult.
+# shorten=True (hoặc số nước đi của cửa sổ) rút ngắn lời giải vừa tìm được bằng shortening.py trong cùng limits;
+# không có limits thì việc rút ngắn bị giới hạn theo thời gian giải (shortening.TIME_RATIO, shortening.MIN_TIME)
+def solve(given_state, size, algorithm='ids', max_depth=80, cache=None, progress=None, use_table=True, limits=None,
+          shorten=False, **options):
+    start_time = time()
+    if size == 3 and use_table and algorithm in OPTIMAL_SOLVERS:
+        import eight_puzzle
+        solution, nodes_visited = eight_puzzle.solve(given_state)
+        if solution is not None and max_depth is not None and len(solution) > max_depth:
+            solution = None
+        result = SearchResult(solution, nodes_visited, elapsed=time() - start_time)
+    else:
+        # Cache giữ lời giải gốc của giải thuật; việc rút ngắn (nếu có) luôn làm sau khi tra cache
+        variant = _cache_variant(algorithm, options)
+        solution = cache.get(algorithm, given_state, size, variant, max_depth) if cache is not None else None
+        if solution is not None:
+            result = SearchResult(solution, 0, elapsed=time() - start_time)
+        else:
+            if progress is not None:
+                options['progress'] = progress
+            if limits is not None:
+                options['limits'] = limits
+            result = SOLVERS[algorithm](given_state, size, max_depth, **options)
+            if cache is not None and result.solution is not None:
+                cache.put(algorithm, given_state, size, result.solution, variant)
+        if shorten and result.solution is not None:
+            import shortening
+            window = shortening.DEFAULT_WINDOW if shorten is True else shorten
+            if limits is None:
+                limits = SearchLimits(time_limit=max(shortening.MIN_TIME, shortening.TIME_RATIO * result.elapsed))
+            solution, stats = shortening.shorten_solution(given_state, size, result.solution, window, limits)
+            result = SearchResult(solution, result.nodes, result.status, time() - start_time,
+                                  bound=result.bound, original_length=stats['before'])
+    if progress is not None:
+        progress.report(result.nodes, result.depth, result.bound, done=True)
+    return result
+
+# Các giải thuật luôn trả về lời giải ngắn nhất
+OPTIMAL_SOLVERS = {'ids', 'idastar', 'mbida', 'astar', 'bidir', 'bfs', 'pidastar'}
+# Các giải thuật có thông tin (nhận tham số heuristic)
+HEURISTIC_SOLVERS = {'idastar', 'mbida', 'astar', 'pidastar'}
+# Các giải thuật nhận tập đã duyệt (tham số visited, xem visited.py). IDS, A* và tìm kiếm hai chiều
+# cần lưu độ sâu hoặc nút cùng với khoá (bảng chuyển vị, best_depth, chỉ mục) nên không dùng tập này
+VISITED_SOLVERS = {'dfs'}
+
+# Tuỳ chọn của portfolio được chuyển tới các giải thuật đua: node_type cho mọi giải thuật,
+# heuristic chỉ cho các giải thuật có thông tin; các tuỳ chọn khác bị bỏ qua
+def _portfolio_options(algorithm, options):
+    accepted = {}
+    if 'node_type' in options:
+        accepted['node_type'] = options['node_type']
+    if 'heuristic' in options and algorithm in HEURISTIC_SOLVERS:
+        accepted['heuristic'] = options['heuristic']
+    return accepted
+
+def _portfolio_worker(algorithm, given_state, size, max_depth, results, sinks, limits, options):
+    progress = Progress(algorithm, sinks) if sinks else None
+    result = solve(given_state, size, algorithm, max_depth, progress=progress, limits=limits,
+                   **_portfolio_options(algorithm, options))
+    results.put((algorithm, result))
+
+# Số giây chờ các giải thuật thua tự dừng (qua CancellationToken) trước khi dừng cưỡng bức
+PORTFOLIO_GRACE = 1.0
+# Chu kỳ (giây) kiểm tra limits của người gọi trong lúc chờ kết quả
+PORTFOLIO_POLL = 0.1
+
+def portfolio(given_state, size, algorithms=('idastar', 'bidir', 'ids'), quality='optimal', max_depth=80,
+              timeout=None, log=None, progress=None, limits=None, **options):
+    """
+    Chạy song song nhiều giải thuật, mỗi giải thuật một tiến trình, và lấy lời giải đầu tiên đạt
+    yêu cầu: quality='any' nhận mọi lời giải, quality='optimal' chỉ nhận lời giải của các giải
+    thuật tối ưu. Các tiến trình còn lại được huỷ qua CancellationToken (dừng cưỡng bức nếu sau
+    PORTFOLIO_GRACE giây vẫn chạy). Nếu có log, thông tin giải thuật thắng được ghi thêm vào file
+    đó (mỗi dòng một JSON) để điều chỉnh danh sách sau này.
+    Nếu có progress, mỗi giải thuật gửi sự kiện tiến trình riêng (trường algorithm) tới các sink của nó.
+    limits (SearchLimits) áp dụng cho cả portfolio: mỗi giải thuật nhận cùng hạn thời gian, số nút
+    và bộ nhớ; timeout là cách viết cũ của limits.time_limit.
+    Các tuỳ chọn còn lại (options) được chuyển tới giải thuật nào nhận chúng: node_type cho mọi giải
+    thuật, heuristic cho các giải thuật có thông tin.
+    Trả về (SearchResult, tên giải thuật thắng).
+    """
+    if quality not in ('any', 'optimal'):
+        raise ValueError(f"unknown quality {quality!r}")
+    if 'pidastar' in algorithms:
+        raise ValueError("pidastar starts its own worker processes and cannot run inside a portfolio")
+    start_time = time()
+    if limits is None:
+        limits = SearchLimits(timeout)
+    stop = CancellationToken()
+    worker_limits = SearchLimits(limits.remaining(), limits.node_limit,
+                                 None if limits.memory_bytes is None else limits.memory_bytes / (1024 * 1024), stop)
+    results = Queue()
+    sinks = progress.sinks if progress is not None else []
+    solvers = [Process(target=_portfolio_worker,
+                       args=(algorithm, given_state, size, max_depth, results, sinks, worker_limits, options),
+                       daemon=True)
+               for algorithm in algorithms]
+    for solver in solvers:
+        solver.start()
+
+    winner, solution, nodes_visited, status = None, None, 0, None
+    try:
+        pending = len(solvers)
+        while pending:
+            try:
+                algorithm, candidate = results.get(timeout=PORTFOLIO_POLL)
+            except queue.Empty:
+                status = limits.check()
+                if status is not None:
+                    break
+                continue
+            pending -= 1
+            if candidate.solution is None or (quality == 'optimal' and algorithm not in OPTIMAL_SOLVERS):
+                # Giải thuật dừng vì giới hạn thì cả portfolio cũng dừng vì giới hạn đó
+                if candidate.status != 'exhausted':
+                    status = candidate.status
+                continue
+            winner, solution, nodes_visited, status = algorithm, candidate.solution, candidate.nodes, None
+            break
+    finally:
+        # Huỷ các giải thuật còn đang chạy, dừng cưỡng bức nếu chúng không tự dừng kịp
+        stop.cancel()
+        for solver in solvers:
+            solver.join(PORTFOLIO_GRACE)
+        for solver in solvers:
+            if solver.is_alive():
+                solver.terminate()
+                solver.join()
+        results.close()
+
+    if log is not None:
+        with open(log, 'a') as file:
+            file.write(json.dumps({"size": size, "state": given_state, "algorithms": list(algorithms),
+                                   "quality": quality, "winner": winner, "nodes": nodes_visited,
+                                   "steps": len(solution) if solution is not None else None,
+                                   "time": round(time() - start_time, 4)}) + "\n")
+    return SearchResult(solution, nodes_visited, status, time() - start_time), winner
+
+def portfolio_with_steps(given_state, size, max_depth, solution_queue, algorithms=('idastar', 'bidir', 'ids'),
+                         quality='optimal', log=None, progress=None, limits=None):
+    """
+    Chế độ portfolio nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    """
+    start_time = time()
+    result, winner = portfolio(given_state, size, algorithms, quality, max_depth, log=log, progress=progress,
+                               limits=limits)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0, winner
+
+def solve_with_steps(given_state, size, algorithm, max_depth, solution_queue, cache=None, **options):
+    """
+    Giống solve() nhưng gửi các bước di chuyển qua Queue (dùng cho các tiến trình giải của UI).
+    """
+    start_time = time()
+    result = solve(given_state, size, algorithm, max_depth, cache, **options)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
+
+
+# Đọc lần lượt từng bài toán trong file input (không nạp cả file vào bộ nhớ)
+def iter_input(filename):
     with open(filename, "r") as file:
-        inputs = []
         numInput = int(file.readline().strip())
         for _ in range(numInput):
             state = []
@@ -248,33 +1198,294 @@ def readInput(filename):
             for _ in range(size):
                 row = list(map(int, file.readline().strip().split()))
                 state.extend(row)
-            inputs.append((size, state))
-            
-    return inputs
+            yield size, state
 
+def readInput(filename):
+    return list(iter_input(filename))
+
+
+class OutputWriter:
+    """
+    Ghi kết quả từng bài toán ngay khi có và flush sau mỗi bản ghi, để một lần chạy bị dừng giữa
+    chừng không làm mất các kết quả đã ghi. Định dạng 'text' gồm 3 dòng cho mỗi bài toán
+    (Action / Number of explored nodes / Time), định dạng 'jsonl' gồm một đối tượng JSON mỗi dòng.
+    """
+    FORMATS = ('text', 'jsonl')
+
+    def __init__(self, filename, format='text', append=False):
+        if format not in self.FORMATS:
+            raise ValueError(f"unknown output format {format!r}")
+        self.format = format
+        self.count = count_records(filename, format) if append else 0
+        if append:
+            _truncate_partial_record(filename, format, self.count)
+        self.file = open(filename, 'a' if append else 'w')
+
+    def write(self, solution, nodes_visited, elapsed_time):
+        if self.format == 'jsonl':
+            record = json.dumps({"index": self.count, "action": solution, "nodes": nodes_visited,
+                                 "time": round(elapsed_time, 4)}) + "\n"
+        else:
+            record = (f"Action: {solution}\n"
+                      f"Number of explored nodes is: {nodes_visited}\n"
+                      f"Time: {elapsed_time:.4f} second\n")
+        # Ghi cả bản ghi trong một lần để không để lại bản ghi dở dang
+        self.file.write(record)
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
 
-def writeOutput(filename, solutions):
-    with open(filename, 'w') as file:
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Số bản ghi hoàn chỉnh trong file output (dùng để chạy tiếp từ bản ghi cuối cùng)
+def count_records(filename, format='text'):
+    if not os.path.exists(filename):
+        return 0
+    count = 0
+    with open(filename, "r") as file:
+        for line in file:
+            if not line.endswith("\n"):
+                break
+            if format == 'jsonl' or line.startswith("Time: "):
+                count += 1
+    return count
+
+# Cắt bỏ phần bản ghi dở dang (nếu có) sau count bản ghi hoàn chỉnh
+def _truncate_partial_record(filename, format, count):
+    if not os.path.exists(filename):
+        return
+    with open(filename, "r+") as file:
+        seen = 0
+        while seen < count:
+            line = file.readline()
+            if format == 'jsonl' or line.startswith("Time: "):
+                seen += 1
+        file.truncate(file.tell())
+
+def writeOutput(filename, solutions, mode='w'):
+    with OutputWriter(filename, append=(mode == 'a')) as writer:
         for solution, nodes_visited, elapsed_time in solutions:
-            file.write(f"Action: {solution}\n")
-            file.write(f"Number of explored nodes is: {nodes_visited}\n")
-            file.write(f"Time: {elapsed_time:.4f} second")
-    
-def main():
-    # Đọc bài toán từ file input
-    inputs = readInput("input.txt")
-    output_file = "output.txt"
-    print("Loading...")
-    solutions = []
-    for size, initial_state in inputs:
+            writer.write(solution, nodes_visited, elapsed_time)
+
+
+# Tuỳ chọn giải thuật của tiến trình con trong chế độ batch (được nạp một lần khi khởi tạo);
+# heuristic theo tên được tạo theo kích thước của từng bài
+_batch_options = {}
+_batch_heuristic = None
+
+def _init_batch_worker(node_type, pdb, cache_size=0, cache_path=None, heuristic=None, shorten=False):
+    global _batch_heuristic
+    _batch_options.clear()
+    _batch_heuristic = heuristic
+    if shorten:
+        _batch_options['shorten'] = shorten
+    if cache_size or cache_path:
+        import solution_cache
+        _batch_options['cache'] = solution_cache.SolutionCache(cache_size, cache_path)
+    if node_type is not None:
+        _batch_options['node_type'] = node_type
+    if pdb:
+        _batch_options['heuristic'] = load_heuristic(pdb)
+
+# Giải một nhóm bài toán trong tiến trình con, mỗi bài có giới hạn (SearchLimits) riêng
+def _solve_chunk(algorithm, max_depth, timeout, chunk, node_limit=None, memory_mb=None):
+    results = []
+    for size, initial_state in chunk:
         start_time = time()
-        # solution, nodes_visited = DFS(initial_state, size)
-        solution, nodes_visited = IDS(initial_state, size, 80)
-        elapsed_time = time() - start_time
-        solutions.append((solution, nodes_visited, elapsed_time))
-        print("Solution:", solution)
+        limits = SearchLimits(timeout, node_limit, memory_mb)
+        options = _batch_options
+        if _batch_heuristic is not None and 'heuristic' not in options:
+            options = dict(options, heuristic=make_heuristic(_batch_heuristic, size))
+        solution, nodes_visited = solve(initial_state, size, algorithm, max_depth, limits=limits, **options)
+        results.append((solution, nodes_visited, time() - start_time))
+    return results
+
+def solve_batch(inputs, writer, algorithm='ids', max_depth=80, processes=None, chunksize=1,
+                timeout=None, node_type=None, pdb=None, cache_size=0, cache_path=None, node_limit=None,
+                memory_mb=None, heuristic=None, shorten=False):
+    """
+    Giải nhiều bài toán song song bằng một pool tiến trình. Bài toán được gửi theo từng nhóm
+    chunksize bài, kết quả được ghi qua writer (OutputWriter) ngay khi có, theo đúng thứ tự
+    trong file input. timeout, node_limit và memory_mb là giới hạn của từng bài: giải thuật tự
+    dừng khi vượt giới hạn và bài đó được ghi là không có lời giải.
+    Trả về thống kê tổng (số bài, số nút, thời gian, bài/giây, nút/giây).
+    """
+    start_time = time()
+    solved = 0
+    total_puzzles = 0
+    total_nodes = 0
+    with Pool(processes, initializer=_init_batch_worker,
+              initargs=(node_type, pdb, cache_size, cache_path, heuristic, shorten)) as pool:
+        # Giới hạn số nhóm đang chờ để không nạp toàn bộ file vào hàng đợi của pool
+        window = 2 * (processes or pool._processes)
+        pending = deque()
+        chunk = []
+
+        def collect():
+            nonlocal solved, total_puzzles, total_nodes
+            results = pending.popleft().get()
+            for solution, nodes_visited, elapsed_time in results:
+                writer.write(solution, nodes_visited, elapsed_time)
+                total_puzzles += 1
+                total_nodes += nodes_visited
+                if solution is not None:
+                    solved += 1
+
+        for puzzle in inputs:
+            chunk.append(puzzle)
+            if len(chunk) == chunksize:
+                pending.append(pool.apply_async(_solve_chunk,
+                                                (algorithm, max_depth, timeout, chunk, node_limit, memory_mb)))
+                chunk = []
+                if len(pending) >= window:
+                    collect()
+        if chunk:
+            pending.append(pool.apply_async(_solve_chunk,
+                                            (algorithm, max_depth, timeout, chunk, node_limit, memory_mb)))
+        while pending:
+            collect()
+
+    elapsed_time = time() - start_time
+    return {
+        'puzzles': total_puzzles,
+        'solved': solved,
+        'nodes': total_nodes,
+        'elapsed': elapsed_time,
+        'puzzles_per_second': total_puzzles / elapsed_time if elapsed_time else 0.0,
+        'nodes_per_second': total_nodes / elapsed_time if elapsed_time else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="N-Puzzle solver")
+    parser.add_argument("-a", "--algorithm", choices=sorted(SOLVERS), default="ids")
+    parser.add_argument("--max-depth", type=int, default=80)
+    parser.add_argument("-i", "--input", default="input.txt")
+    parser.add_argument("-o", "--output", default="output.txt")
+    parser.add_argument("--format", choices=OutputWriter.FORMATS, default="text", help="output record format")
+    parser.add_argument("--resume", action="store_true", help="keep existing records in the output file and continue after them")
+    parser.add_argument("--packed", action="store_true", help="use integer-packed search nodes (less memory per node)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print per-iteration (ids) or per-worker (pidastar) node counts")
+    parser.add_argument("--memory-mb", type=float, default=64, help="memory budget of the mbida transposition table")
+    parser.add_argument("--weight", type=float, default=2.0,
+                        help="heuristic weight of -a reduce: higher is faster, lower gives shorter solutions")
+    parser.add_argument("--pdb", help="pattern database or walking distance table file used as heuristic by "
+                                      "idastar/mbida/astar/pidastar (also when raced by -a portfolio)")
+    parser.add_argument("--heuristic", choices=HEURISTICS,
+                        help="heuristic of idastar/mbida/astar/pidastar, also when raced by -a portfolio "
+                             "(tables are built and cached on first use)")
+    parser.add_argument("-j", "--workers", type=int, help="solve the input file in batch mode with this many processes")
+    parser.add_argument("--processes", type=int, help="worker processes of -a pidastar (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=1, help="puzzles per task sent to a batch worker")
+    parser.add_argument("--timeout", type=float, help="time limit per puzzle (seconds)")
+    parser.add_argument("--node-limit", type=int, help="stop a search after expanding this many nodes")
+    parser.add_argument("--memory-limit", type=float, metavar="MB",
+                        help="stop a search when its estimated frontier and visited memory exceeds this many MB")
+    parser.add_argument("--portfolio", default="idastar,bidir,ids", help="comma-separated solvers raced by -a portfolio")
+    parser.add_argument("--quality", choices=("any", "optimal"), default="optimal", help="solutions accepted by -a portfolio")
+    parser.add_argument("--portfolio-log", help="append the winning solver of each portfolio run to this JSON Lines file")
+    parser.add_argument("--progress", type=float, metavar="SECONDS",
+                        help="log search progress (nodes/s, depth, frontier, memory) at this interval")
+    parser.add_argument("--no-table", action="store_true",
+                        help="search 3x3 boards instead of reading the precomputed distance table")
+    parser.add_argument("--visited", choices=("set", "bitset", "bloom"),
+                        help="visited set used by dfs: exact packed keys, rank bitset (3x3) or Bloom filter")
+    parser.add_argument("--bloom-error", type=float, default=0.01, help="false-positive rate of --visited bloom")
+    parser.add_argument("--bloom-capacity", type=int, default=10_000_000, help="expected entries of --visited bloom")
+    parser.add_argument("--shorten", type=int, nargs="?", const=True, default=False, metavar="WINDOW",
+                        help="shorten each solution (loop removal, then optimal re-search of WINDOW-move segments)")
+    parser.add_argument("--cache", help="SQLite file that keeps solutions between runs")
+    parser.add_argument("--cache-size", type=int, default=4096, help="solutions kept in memory (LRU), 0 disables the cache")
+    args = parser.parse_args()
+    if args.visited and args.algorithm not in VISITED_SOLVERS:
+        parser.error(f"--visited is only supported by {', '.join(sorted(VISITED_SOLVERS))}, not -a {args.algorithm}")
+
+    # Đọc bài toán từ file input theo dạng luồng, bỏ qua các bài đã có kết quả nếu chạy tiếp
+    inputs = iter_input(args.input)
+    writer = OutputWriter(args.output, args.format, append=args.resume)
+    if writer.count:
+        print(f"Resuming after {writer.count} records")
+        inputs = islice(inputs, writer.count, None)
+
+    # Heuristic (--pdb, --heuristic) chỉ dùng cho giải thuật có thông tin, portfolio chuyển tiếp cho chúng
+    uses_heuristic = args.algorithm in HEURISTIC_SOLVERS or args.algorithm == 'portfolio'
+    with writer:
+        if args.workers:
+            stats = solve_batch(inputs, writer, args.algorithm, args.max_depth, args.workers,
+                                args.chunksize, args.timeout, PackedState if args.packed else None,
+                                args.pdb if uses_heuristic else None,
+                                args.cache_size, args.cache, args.node_limit, args.memory_limit,
+                                args.heuristic if uses_heuristic else None, args.shorten)
+            print(f"Solved {stats['solved']}/{stats['puzzles']} puzzles in {stats['elapsed']:.2f} second "
+                  f"({stats['puzzles_per_second']:.2f} puzzles/s, {stats['nodes_per_second']:.0f} nodes/s)")
+            return
+
+        options = {'use_table': not args.no_table, 'shorten': args.shorten}
+        if args.algorithm == 'portfolio':
+            options.update(algorithms=tuple(args.portfolio.split(',')), quality=args.quality, log=args.portfolio_log)
+        if args.algorithm == 'mbida':
+            options['memory_mb'] = args.memory_mb
+        if args.algorithm == 'reduce':
+            options['weight'] = args.weight
+        if args.algorithm == 'pidastar' and args.processes:
+            options['processes'] = args.processes
+        if args.packed:
+            options['node_type'] = PackedState
+        if args.pdb and uses_heuristic:
+            options['heuristic'] = load_heuristic(args.pdb)
+        if args.cache_size or args.cache:
+            import solution_cache
+            options['cache'] = solution_cache.SolutionCache(args.cache_size, args.cache)
+
+        if args.progress:
+            logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+        print("Loading...")
+        for size, initial_state in inputs:
+            if args.verbose and args.algorithm == 'ids':
+                options['iteration_nodes'] = []
+            if args.verbose and args.algorithm == 'pidastar':
+                options['worker_nodes'] = []
+            if args.verbose and args.algorithm == 'mbida':
+                options['table_stats'] = {}
+            if args.heuristic and not args.pdb and uses_heuristic:
+                options['heuristic'] = make_heuristic(args.heuristic, size)
+            if args.visited:
+                import visited
+                try:
+                    options['visited'] = visited.make(args.visited, size, args.bloom_capacity, args.bloom_error)
+                except ValueError as error:
+                    parser.error(str(error))
+            if args.progress:
+                options['progress'] = Progress(args.algorithm, [LogSink()], args.progress)
+            start_time = time()
+            limits = SearchLimits(args.timeout, args.node_limit, args.memory_limit)
+            result = solve(initial_state, size, args.algorithm, args.max_depth, limits=limits, **options)
+            solution, nodes_visited = result
+            elapsed_time = time() - start_time
+            writer.write(solution, nodes_visited, elapsed_time)
+            print("Solution:", solution)
+            if result.original_length is not None:
+                print(f"Shortened from {result.original_length} to {len(solution)} moves")
+            if solution is None:
+                print(f"Stopped: {result.status} after {nodes_visited} nodes "
+                      f"(depth {result.depth}, bound {result.bound})")
+            if 'iteration_nodes' in options:
+                print("Nodes per iteration:", options['iteration_nodes'])
+            if 'worker_nodes' in options:
+                print("Nodes per worker:", options['worker_nodes'])
+            if 'table_stats' in options:
+                print("Transposition table:", options['table_stats'])
+        if 'cache' in options:
+            stats = options['cache'].stats()
+            print(f"Cache: {stats['hits'] + stats['disk_hits']} hits, {stats['misses']} misses")
+            options['cache'].close()
 
-    writeOutput(output_file, solutions)
     print("Done!")
 
 if __name__ == "__main__":
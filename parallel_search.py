@@ -0,0 +1,200 @@
+import os
+import queue
+from time import time
+from multiprocessing import Process, Queue, Value, RawValue, Array
+import npuzzle
+
+# Số nút duyệt giữa hai lần kiểm tra cờ "đã tìm thấy lời giải"
+CHECK_INTERVAL = 1024
+# Chu kỳ (giây) tiến trình cha kiểm tra limits trong lúc chờ kết quả của các cây con
+LIMITS_POLL = 0.1
+
+def split_root(given_state, size, min_subtrees):
+    """
+    Mở rộng nút gốc theo chiều rộng cho tới khi có ít nhất min_subtrees cây con.
+    Trả về (lời giải nếu gặp trong lúc mở rộng, danh sách nút biên, số nút đã mở rộng).
+    """
+    root = npuzzle.State.root(given_state, size)
+    if root.check():
+        return [], [], 0
+    frontier = [root]
+    seen = {root.key()}
+    nodes_visited = 0
+    while len(frontier) < min_subtrees:
+        next_frontier = []
+        for node in frontier:
+            nodes_visited += 1
+            for child in node.expand():
+                if child.check():
+                    return child.solution(), [], nodes_visited
+                child_key = child.key()
+                if child_key not in seen:
+                    seen.add(child_key)
+                    next_frontier.append(child)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return None, frontier, nodes_visited
+
+def _load_heuristic(size, pdb):
+    if pdb:
+        return npuzzle.load_heuristic(pdb)
+    return npuzzle.ManhattanLinearConflict(size)
+
+# Tiến trình con: nhận chỉ số cây con từ tasks, duyệt cây con với ngưỡng hiện tại (bound) và gửi kết quả
+# (lời giải, ngưỡng kế tiếp, None) về; lỗi được gửi về dạng (None, None, thông báo lỗi) rồi tiến trình dừng
+def _worker(worker_id, subtrees, size, pdb, tasks, results, bound, found, worker_nodes):
+    try:
+        _search_subtrees(worker_id, subtrees, size, pdb, tasks, results, bound, found, worker_nodes)
+    except Exception as error:
+        results.put((None, None, f"{type(error).__name__}: {error}"))
+
+def _search_subtrees(worker_id, subtrees, size, pdb, tasks, results, bound, found, worker_nodes):
+    heuristic = _load_heuristic(size, pdb)
+    roots = []
+    for board, blank, action, depth, prefix in subtrees:
+        subroot = npuzzle.State(board, None, action, depth, size, blank)
+        heuristic.initialize(subroot)
+        roots.append((subroot, prefix))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        if found.value:
+            # Đã có lời giải hoặc tiến trình cha đã dừng: bỏ qua cây con
+            results.put((None, None, None))
+            continue
+        subroot, prefix = roots[task]
+        limit = bound.value
+        nodes_visited = 0
+        next_bound = None
+        solution = None
+        stack = [subroot]
+        while stack:
+            current_node = stack.pop()
+            nodes_visited += 1
+            if nodes_visited % CHECK_INTERVAL == 0 and found.value:
+                break
+            if current_node.check():
+                solution = prefix + current_node.solution()
+                found.value = 1
+                break
+            promising = []
+            for child in current_node.expand():
+                heuristic.update(current_node, child)
+                f = child.depth + child.h
+                if f > limit:
+                    if next_bound is None or f < next_bound:
+                        next_bound = f
+                else:
+                    promising.append(child)
+            promising.sort(key=lambda node: node.h, reverse=True)
+            stack.extend(promising)
+        worker_nodes[worker_id] += nodes_visited
+        results.put((solution, next_bound, None))
+
+def parallel_IDA_star(given_state, size, max_depth=80, processes=None, pdb=None, worker_nodes=None, progress=None,
+                      limits=None):
+    """
+    IDA* song song: nút gốc được mở rộng thành nhiều cây con, các tiến trình con cùng duyệt các cây
+    con với một ngưỡng f dùng chung (Value). Khi một tiến trình tìm thấy lời giải, cờ found được bật
+    và các tiến trình khác dừng ở lần kiểm tra kế tiếp (sau mỗi CHECK_INTERVAL nút). Nếu truyền list worker_nodes, số nút của từng tiến trình
+    được ghi vào list đó. Nếu có progress, một sự kiện được gửi sau mỗi vòng tăng ngưỡng.
+    limits (npuzzle.SearchLimits) được tiến trình cha kiểm tra trong lúc chờ kết quả; khi phải dừng,
+    cờ found cũng được bật để các tiến trình con thoát khỏi cây con đang duyệt. Số nút của tiến
+    trình con chỉ được cộng dồn sau mỗi cây con nên node_limit được kiểm tra thô hơn các giải thuật khác.
+    Nếu một tiến trình con gặp lỗi hoặc chết giữa chừng, các tiến trình còn lại được dừng và RuntimeError
+    được báo cho người gọi.
+    """
+    start_time = time()
+    processes = processes or os.cpu_count() or 1
+    solution, frontier, nodes_visited = split_root(given_state, size, 8 * processes)
+    if solution is not None:
+        return npuzzle.SearchResult(solution, nodes_visited, elapsed=time() - start_time)
+    if not frontier:
+        return npuzzle.SearchResult(None, nodes_visited, elapsed=time() - start_time)
+
+    heuristic = _load_heuristic(size, pdb)
+    subtrees = []
+    for node in frontier:
+        prefix = node.solution()
+        subtrees.append((node.state, node.blank, node.action, node.depth, prefix))
+    root = npuzzle.State.root(given_state, size)
+    heuristic.initialize(root)
+
+    tasks = Queue()
+    results = Queue()
+    bound = Value('i', root.h)
+    # Cờ chỉ được bật từ 0 lên 1 nên không cần khoá; tiến trình con đọc cờ sau mỗi CHECK_INTERVAL nút
+    found = RawValue('b', 0)
+    counts = Array('q', processes)
+    workers = [Process(target=_worker, args=(worker_id, subtrees, size, pdb, tasks, results, bound, found, counts))
+               for worker_id in range(processes)]
+    for worker in workers:
+        worker.start()
+
+    solution = None
+    status = None
+    error = None
+    try:
+        # Mỗi vòng lặp: giao toàn bộ cây con với cùng ngưỡng, chờ đủ kết quả rồi tăng ngưỡng
+        while bound.value <= max_depth:
+            for task in range(len(subtrees)):
+                tasks.put(task)
+            next_bound = None
+            received = 0
+            while received < len(subtrees):
+                try:
+                    subtree_solution, subtree_bound, error = results.get(timeout=LIMITS_POLL)
+                except queue.Empty:
+                    # Tiến trình con chết mà không kịp báo lỗi (ví dụ bị hệ điều hành giết)
+                    for worker in workers:
+                        if worker.exitcode is not None:
+                            error = f"worker process exited with code {worker.exitcode}"
+                    if error is not None:
+                        break
+                    if limits is not None and status is None:
+                        status = limits.check(nodes_visited + sum(counts))
+                        if status is not None:
+                            found.value = 1
+                    continue
+                if error is not None:
+                    break
+                received += 1
+                if subtree_solution is not None and solution is None:
+                    solution = subtree_solution
+                if subtree_bound is not None and (next_bound is None or subtree_bound < next_bound):
+                    next_bound = subtree_bound
+            if solution is not None:
+                status = None
+            if error is not None or solution is not None or status is not None or next_bound is None:
+                break
+            if progress is not None:
+                progress.report(nodes_visited + sum(counts), None, bound.value, len(subtrees))
+            bound.value = next_bound
+    finally:
+        # Các cây con còn trong hàng đợi (khi dừng giữa vòng) được bỏ qua nhờ cờ found
+        found.value = 1
+        for _ in workers:
+            tasks.put(None)
+        for worker in workers:
+            worker.join()
+
+    if error is not None:
+        raise RuntimeError(f"parallel IDA* worker failed: {error}")
+
+    if worker_nodes is not None:
+        worker_nodes.extend(counts)
+    return npuzzle.SearchResult(solution, nodes_visited + sum(counts), status, time() - start_time, bound=bound.value)
+
+def parallel_IDA_star_with_steps(given_state, size, max_depth, solution_queue, processes=None, limits=None):
+    """
+    IDA* song song nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    """
+    start_time = time()
+    result = parallel_IDA_star(given_state, size, max_depth, processes, limits=limits)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    npuzzle.put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
@@ -0,0 +1,226 @@
+import os
+import sys
+import mmap
+import struct
+import argparse
+from time import time
+import npuzzle
+
+# Định dạng file bảng: header cố định, mô tả các nhóm ô, sau đó là các bảng nối tiếp nhau
+MAGIC = b'NPDB'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHBB')   # magic, version, size, số nhóm ô
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+
+# Các cách chia ô có sẵn cho 4x4 (mỗi nhóm là một tập các ô số rời nhau)
+PARTITIONS = {
+    4: {
+        '5-5-5': [(1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)],
+        '6-6-3': [(1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4)],
+    },
+    5: {
+        '4x6': [(1, 2, 6, 7), (3, 4, 5, 8), (9, 10, 14, 15), (11, 12, 16, 17), (13, 18, 22, 23), (19, 20, 21, 24)],
+    },
+}
+DEFAULT_PARTITION = {4: '5-5-5', 5: '4x6'}
+
+
+class PatternDatabase:
+    """
+    Heuristic cộng dồn từ các pattern database rời nhau. Mỗi bảng lưu số nước đi tối thiểu
+    của riêng các ô trong nhóm (nước đi của ô ngoài nhóm có chi phí 0) nên tổng các bảng
+    vẫn chấp nhận được. Dùng được như heuristic của IDA_star/A_star.
+    """
+    def __init__(self, size, patterns, tables, source=None, path=None):
+        self.size = size
+        self.path = path # File đã nạp (để tiến trình khác có thể tự ánh xạ lại cùng bảng)
+        self.patterns = [tuple(pattern) for pattern in patterns]
+        self.tables = tables
+        self.source = source # Giữ tham chiếu tới vùng nhớ mmap (nếu có)
+        # Nhóm chứa từng ô số
+        self.pattern_of = [None] * (size * size)
+        for index, pattern in enumerate(self.patterns):
+            for tile in pattern:
+                self.pattern_of[tile] = index
+
+    @classmethod
+    def load(cls, path):
+        # Ánh xạ file vào bộ nhớ: các tiến trình cùng đọc một file sẽ dùng chung các trang nhớ
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a pattern database file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has table format version {version}, expected {FORMAT_VERSION}")
+        offset = HEADER.size
+        patterns = []
+        for _ in range(count):
+            k = buffer[offset]
+            patterns.append(tuple(buffer[offset + 1:offset + 1 + k]))
+            offset += 1 + k
+        view = memoryview(buffer)
+        tables = []
+        for pattern in patterns:
+            length = table_length(size * size, len(pattern))
+            tables.append(view[offset:offset + length])
+            offset += length
+        return cls(size, patterns, tables, buffer, path)
+
+    def __reduce__(self):
+        # Tiến trình con nạp lại bảng từ file thay vì nhận bản sao
+        return (PatternDatabase.load, (self.path,))
+
+    def save(self, path):
+        # Ghi qua file tạm rồi thay thế: tiến trình khác có thể đang ánh xạ file cũ
+        with npuzzle.replace_file(path) as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.size, len(self.patterns)))
+            for pattern in self.patterns:
+                file.write(bytes([len(pattern)]) + bytes(pattern))
+            for table in self.tables:
+                file.write(table)
+
+    def evaluate(self, board):
+        n = self.size * self.size
+        total = 0
+        for pattern, table in zip(self.patterns, self.tables):
+            total += table[rank([board.index(tile) for tile in pattern], n)]
+        return total
+
+    # Gán giá trị heuristic cho nút gốc
+    def initialize(self, node):
+        node.h = self.evaluate(node.state)
+
+    # Chỉ bảng của nhóm chứa ô vừa di chuyển thay đổi giá trị
+    def update(self, parent, child):
+        dst = parent.blank
+        src = child.blank
+        board = child.state
+        tile = board[dst]
+        index = self.pattern_of[tile]
+        if index is None:
+            child.h = parent.h
+            return
+        n = self.size * self.size
+        pattern = self.patterns[index]
+        table = self.tables[index]
+        positions = [board.index(t) for t in pattern]
+        new_value = table[rank(positions, n)]
+        positions[pattern.index(tile)] = src
+        child.h = parent.h - table[rank(positions, n)] + new_value
+
+
+# Số cách đặt k ô vào n vị trí: n * (n - 1) * ... * (n - k + 1)
+def table_length(n, k):
+    length = 1
+    for i in range(k):
+        length *= n - i
+    return length
+
+# Xếp hạng hoán vị chập k (vị trí của các ô trong nhóm) thành chỉ số trong bảng
+def rank(positions, n):
+    index = 0
+    for i, position in enumerate(positions):
+        smaller = 0
+        for previous in positions[:i]:
+            if previous < position:
+                smaller += 1
+        index = index * (n - i) + position - smaller
+    return index
+
+def build_table(size, pattern):
+    """
+    BFS ngược 0-1 từ trạng thái mục tiêu trên không gian (vị trí các ô trong nhóm, vị trí ô trống).
+    Di chuyển ô ngoài nhóm có chi phí 0, di chuyển ô trong nhóm có chi phí 1.
+    """
+    n = size * size
+    k = len(pattern)
+    length = table_length(n, k)
+    unseen = 255
+    dist = bytearray([unseen]) * (length * n)
+
+    # Các ô kề của từng vị trí, lấy từ bảng nước đi của npuzzle
+    neighbours = [[target for _, target in moves] for moves in npuzzle.get_context(size).moves]
+
+    goal = tuple(tile - 1 for tile in pattern)
+    # Mỗi phần tử: (vị trí các ô trong nhóm, rank(vị trí) * n, vị trí ô trống)
+    current = [(goal, rank(goal, n) * n, n - 1)]
+    cost = 0
+    while current:
+        following = []
+        while current:
+            positions, base, blank = current.pop()
+            if dist[base + blank] != unseen:
+                continue
+            dist[base + blank] = cost
+            for target in neighbours[blank]:
+                if target in positions:
+                    # Ô trong nhóm trượt vào ô trống: tốn 1 nước
+                    moved = tuple(blank if p == target else p for p in positions)
+                    following.append((moved, rank(moved, n) * n, target))
+                elif dist[base + target] == unseen:
+                    # Ô ngoài nhóm: chỉ ô trống đổi chỗ, không tốn nước nào
+                    current.append((positions, base, target))
+        current = following
+        cost += 1
+
+    # Giá trị của một cách đặt nhóm là min theo mọi vị trí ô trống
+    table = bytearray(length)
+    for index in range(length):
+        table[index] = min(dist[index * n:(index + 1) * n])
+    return table
+
+def parse_partition(size, spec):
+    if spec in PARTITIONS.get(size, {}):
+        return PARTITIONS[size][spec]
+    # Dạng tuỳ chọn: "1,2,3/4,5,6/..."
+    patterns = [tuple(int(tile) for tile in group.split(',')) for group in spec.split('/')]
+    tiles = [tile for pattern in patterns for tile in pattern]
+    if sorted(tiles) != list(range(1, size * size)):
+        raise ValueError(f"partition {spec!r} must cover tiles 1..{size * size - 1} exactly once")
+    return patterns
+
+def default_path(size, spec):
+    name = spec.replace('/', '_').replace(',', '-')
+    return os.path.join(TABLE_DIR, f"pdb_{size}x{size}_{name}.bin")
+
+def build(size, spec, path=None):
+    patterns = parse_partition(size, spec)
+    tables = []
+    for pattern in patterns:
+        start_time = time()
+        tables.append(build_table(size, pattern))
+        print(f"Pattern {pattern}: {len(tables[-1])} entries, {time() - start_time:.1f} second")
+    database = PatternDatabase(size, patterns, tables)
+    path = path or default_path(size, spec)
+    database.save(path)
+    return path
+
+def load(size, spec=None):
+    # Nạp bảng đã sinh sẵn cho kích thước size (memory-mapped)
+    return PatternDatabase.load(default_path(size, spec or DEFAULT_PARTITION[size]))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build additive pattern databases for the N-Puzzle")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="generate a table file")
+    build_parser.add_argument("size", type=int)
+    build_parser.add_argument("-p", "--partition", help="named partition (e.g. 5-5-5, 6-6-3) or groups like 1,2,3/4,5,6/...")
+    build_parser.add_argument("-o", "--output")
+    info_parser = subparsers.add_parser("info", help="show the header of a table file")
+    info_parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        spec = args.partition or DEFAULT_PARTITION.get(args.size)
+        if spec is None:
+            parser.error(f"no default partition for size {args.size}, use --partition")
+        print("Written to", build(args.size, spec, args.output))
+    else:
+        database = PatternDatabase.load(args.path)
+        print(f"Format version {FORMAT_VERSION}, size {database.size}x{database.size}")
+        for pattern, table in zip(database.patterns, database.tables):
+            print(f"Pattern {pattern}: {len(table)} entries, max {max(table)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
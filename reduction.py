@@ -0,0 +1,170 @@
+import heapq
+from time import time
+import npuzzle
+
+DEFAULT_WEIGHT = 2.0
+
+def _place(board, size, blank, group, goals, top, left, fixed, weight):
+    """
+    Tìm kiếm A* có trọng số trên trạng thái trừu tượng (vị trí ô trống, vị trí các ô trong group):
+    các ô khác được coi là giống nhau. Ô trống chỉ đi trong vùng còn lại (hàng >= top, cột >= left)
+    và không đi vào các vị trí trong fixed (các ô đã đặt xong). Group có tối đa 2 ô nên số trạng
+    thái không vượt quá n^6 với n = size * size.
+    Trả về danh sách mã nước đi đưa mọi ô trong group về goals và số nút đã duyệt.
+    """
+    context = npuzzle.get_context(size)
+    positions = tuple(board.index(tile) for tile in group)
+    start = (blank,) + positions
+    # Ô cuối của group là ô đang được đặt; ô trống cần tới gần nó
+    moving_goal = goals[-1]
+
+    def estimate(state):
+        h = 0
+        for pos, goal in zip(state[1:], goals):
+            h += abs(pos // size - goal // size) + abs(pos % size - goal % size)
+        moving = state[-1]
+        if moving != moving_goal:
+            h += max(0, abs(state[0] // size - moving // size) + abs(state[0] % size - moving % size) - 1)
+        return h
+
+    goal_positions = tuple(goals)
+    best = {start: 0}
+    came_from = {start: None}
+    counter = 0
+    frontier = [(weight * estimate(start), counter, 0, start)]
+    nodes_visited = 0
+    while frontier:
+        _, _, g, state = heapq.heappop(frontier)
+        if best[state] < g:
+            continue
+        nodes_visited += 1
+        if state[1:] == goal_positions:
+            moves = []
+            while came_from[state] is not None:
+                state, move = came_from[state]
+                moves.append(move)
+            moves.reverse()
+            return moves, nodes_visited
+        blank_pos = state[0]
+        for move, target in context.moves[blank_pos]:
+            if target // size < top or target % size < left or target in fixed:
+                continue
+            # Ô ở vị trí target (nếu thuộc group) trượt vào vị trí ô trống cũ
+            child = (target,) + tuple(blank_pos if pos == target else pos for pos in state[1:])
+            child_g = g + 1
+            if child in best and best[child] <= child_g:
+                continue
+            best[child] = child_g
+            came_from[child] = (state, move)
+            counter += 1
+            heapq.heappush(frontier, (child_g + weight * estimate(child), counter, child_g, child))
+    raise ValueError(f"tiles {group} cannot be placed, the board is not solvable")
+
+def _apply(board, size, blank, moves):
+    context = npuzzle.get_context(size)
+    for move in moves:
+        target = dict(context.moves[blank])[move]
+        board[blank], board[target] = board[target], 0
+        blank = target
+    return blank
+
+def _finish(board, size, blank, top, left, limits=None):
+    """
+    Giải tối ưu vùng 3x3 cuối cùng ở góc dưới phải bằng IDA*: các ô được đánh số lại theo vị trí
+    đích trong vùng để thành một bài 8-puzzle. limits được chuyển cho IDA*.
+    Trả về (mã nước đi hoặc None nếu IDA* dừng trước khi có lời giải, số nút đã duyệt, trạng thái của IDA*).
+    """
+    span = size - top
+    region = [row * size + col for row in range(top, size) for col in range(left, size)]
+    local = []
+    for pos in region:
+        tile = board[pos]
+        if tile == 0:
+            local.append(0)
+        else:
+            goal_row, goal_col = divmod(tile - 1, size)
+            local.append((goal_row - top) * span + (goal_col - left) + 1)
+    result = npuzzle.IDA_star(local, span, limits=limits)
+    solution, nodes_visited = result
+    if solution is None:
+        return None, nodes_visited, result.status
+    # Hướng đi của ô trống trong vùng con trùng với hướng đi trên bàn cờ lớn
+    codes = [npuzzle.ACTIONS.index(action) for action in solution]
+    _apply(board, size, blank, codes)
+    return codes, nodes_visited, result.status
+
+def _place_line(board, size, blank, line, top, left, weight, codes, nodes_visited, limits=None):
+    """
+    Đặt các ô thuộc một hàng/cột (danh sách vị trí đích line): từng ô một, ô đã đặt được cố định;
+    riêng hai ô cuối được đặt cùng lúc vì ô cuối không thể vào góc mà không đẩy ô kế bên ra.
+    Nước đi được thêm vào codes. limits được kiểm tra trước mỗi lần đặt ô.
+    Trả về (vị trí ô trống, tổng số nút đã duyệt, lý do dừng hoặc None).
+    """
+    fixed = set()
+    steps = [[goal] for goal in line[:-2]] + [line[-2:]]
+    for goals in steps:
+        if limits is not None:
+            status = limits.check(nodes_visited)
+            if status is not None:
+                return blank, nodes_visited, status
+        group = [goal + 1 for goal in goals]
+        moves, nodes = _place(board, size, blank, group, goals, top, left, fixed, weight)
+        blank = _apply(board, size, blank, moves)
+        codes.extend(moves)
+        nodes_visited += nodes
+        fixed.update(goals)
+    return blank, nodes_visited, None
+
+def reduction_solve(given_state, size, weight=DEFAULT_WEIGHT, limits=None):
+    """
+    Giải thuật không tối ưu cho bàn cờ lớn: lần lượt xếp xong hàng trên cùng rồi cột trái cùng của
+    vùng còn lại (mỗi ô được đặt bằng một tìm kiếm cục bộ), cho tới khi còn vùng 3x3 được giải tối
+    ưu. weight là trọng số của heuristic trong các tìm kiếm cục bộ: lớn hơn thì nhanh hơn nhưng
+    lời giải dài hơn, weight=1 cho từng bước đặt ô ngắn nhất có thể.
+    limits (npuzzle.SearchLimits) được kiểm tra giữa các lần đặt ô; depth của kết quả khi dừng giữa
+    chừng là số nước đi đã xếp được.
+    Trả về npuzzle.SearchResult (lời giải dạng chuỗi như solution(), số nút đã duyệt).
+    """
+    start_time = time()
+    board = list(given_state)
+    blank = board.index(0)
+    if size <= 3:
+        return npuzzle.IDA_star(board, size, limits=limits)
+    codes = []
+    nodes_visited = 0
+    top = left = 0
+    while size - top > 3:
+        row = [top * size + col for col in range(left, size)]
+        blank, nodes_visited, status = _place_line(board, size, blank, row, top, left, weight, codes, nodes_visited,
+                                                   limits)
+        if status is None:
+            top += 1
+            column = [row * size + left for row in range(top, size)]
+            blank, nodes_visited, status = _place_line(board, size, blank, column, top, left, weight, codes,
+                                                       nodes_visited, limits)
+        if status is not None:
+            return npuzzle.SearchResult(None, nodes_visited, status, time() - start_time, len(codes))
+        left += 1
+    if limits is not None:
+        # Phần số nút còn lại của limits dành cho IDA* của vùng cuối (IDA* đếm số nút từ 0)
+        limits = npuzzle.SearchLimits(limits.remaining(),
+                                      None if limits.node_limit is None else limits.node_limit - nodes_visited,
+                                      None if limits.memory_bytes is None else limits.memory_bytes / (1024 * 1024),
+                                      limits.token)
+    moves, nodes, status = _finish(board, size, blank, top, left, limits)
+    nodes_visited += nodes
+    if moves is None:
+        return npuzzle.SearchResult(None, nodes_visited, status, time() - start_time, len(codes))
+    codes.extend(moves)
+    return npuzzle.SearchResult([npuzzle.ACTIONS[code] for code in codes], nodes_visited, elapsed=time() - start_time)
+
+def reduction_solve_with_steps(given_state, size, solution_queue, weight=DEFAULT_WEIGHT, limits=None):
+    """
+    Giải thuật rút gọn hàng/cột nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    """
+    start_time = time()
+    result = reduction_solve(given_state, size, weight, limits)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    npuzzle.put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
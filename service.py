@@ -0,0 +1,543 @@
+import os
+import sys
+import json
+import math
+import signal
+import asyncio
+import argparse
+import itertools
+import http.client
+import socket
+from time import time
+from collections import OrderedDict
+import multiprocessing
+import npuzzle
+import generator
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Quá thời gian giới hạn (hoặc quá lâu sau khi bị huỷ) thêm chừng này giây mà tiến trình giải
+# chưa dừng (giải thuật chưa tới lần kiểm tra SearchLimits kế tiếp) thì tiến trình bị dừng cưỡng bức và khởi động lại
+KILL_GRACE = 2.0
+WATCHDOG_INTERVAL = 0.5
+MAX_FINISHED = 1000 # Số công việc đã xong được giữ lại để tra cứu
+FINAL_STATUSES = {'solved', 'exhausted', 'timeout', 'budget', 'cancelled', 'failed'}
+# Tiến trình giải được tạo từ forkserver: fork trực tiếp từ vòng lặp asyncio sẽ để tiến trình con giữ
+# các socket đang mở (kết nối HTTP không bao giờ đóng hẳn khi một tiến trình giải được khởi động lại)
+_mp = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+class JobSink(npuzzle.ProgressSink):
+    """
+    Gửi sự kiện tiến trình của một công việc về tiến trình dịch vụ dưới dạng ('progress', None, job_id, event).
+    """
+    def __init__(self, results, job_id):
+        self.results = results
+        self.job_id = job_id
+
+    def emit(self, event):
+        self.results.put(('progress', None, self.job_id, event))
+
+def _warm_up(pdb):
+    """
+    Nạp trước các bảng dùng chung để công việc đầu tiên không phải trả chi phí khởi tạo.
+    """
+    import eight_puzzle
+    eight_puzzle.get_table()
+    for size in range(2, 9):
+        npuzzle.get_context(size)
+    import walking_distance
+    walking_distance.get(4)
+    if pdb:
+        return npuzzle.load_heuristic(pdb)
+    return None
+
+def _worker(index, tasks, results, token, pdb):
+    # Ctrl-C chỉ cần dừng tiến trình dịch vụ; tiến trình giải được dừng khi dịch vụ tắt
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    heuristic = _warm_up(pdb)
+    results.put(('ready', index, None, None))
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id = task['id']
+        progress = npuzzle.Progress(task['algorithm'], [JobSink(results, job_id)])
+        limits = npuzzle.SearchLimits(task['time_budget'], task['node_budget'], task['memory_budget'], token)
+        options = {}
+        try:
+            if task['algorithm'] in npuzzle.HEURISTIC_SOLVERS:
+                if task['heuristic'] is not None:
+                    options['heuristic'] = npuzzle.make_heuristic(task['heuristic'], task['size'])
+                elif heuristic is not None and heuristic.size == task['size']:
+                    options['heuristic'] = heuristic
+            result = npuzzle.solve(task['board'], task['size'], task['algorithm'], task['max_depth'],
+                                   progress=progress, limits=limits, **options).to_dict()
+            result['error'] = None
+        except Exception as error:
+            result = {'status': 'failed', 'solution': None, 'nodes': None,
+                      'elapsed': round(time() - limits.start_time, 4), 'depth': None, 'bound': None,
+                      'error': f"{type(error).__name__}: {error}"}
+        results.put(('result', index, job_id, result))
+
+
+class Job:
+    """
+    Một bài toán gửi tới dịch vụ. history giữ mọi sự kiện (tiến trình rồi kết quả) để người theo dõi
+    đến sau vẫn nhận đủ; mỗi người theo dõi có một asyncio.Queue riêng.
+    """
+    def __init__(self, job_id, board, size, algorithm, max_depth, priority, time_budget, node_budget,
+                 memory_budget, heuristic):
+        self.id = job_id
+        self.board = board
+        self.size = size
+        self.algorithm = algorithm
+        self.max_depth = max_depth
+        self.priority = priority
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.memory_budget = memory_budget
+        self.heuristic = heuristic
+        self.status = 'queued'
+        self.submitted = time()
+        self.started = None
+        self.cancel_requested = None
+        self.worker = None
+        self.result = None
+        self.history = []
+        self.subscribers = []
+
+    def task(self):
+        return {'id': self.id, 'board': self.board, 'size': self.size, 'algorithm': self.algorithm,
+                'max_depth': self.max_depth, 'time_budget': self.time_budget, 'node_budget': self.node_budget,
+                'memory_budget': self.memory_budget, 'heuristic': self.heuristic}
+
+    def to_dict(self):
+        return {'id': self.id, 'status': self.status, 'algorithm': self.algorithm, 'heuristic': self.heuristic,
+                'size': self.size,
+                'board': self.board, 'priority': self.priority, 'time_budget': self.time_budget,
+                'node_budget': self.node_budget, 'memory_budget': self.memory_budget, 'result': self.result}
+
+    def publish(self, message):
+        self.history.append(message)
+        for subscriber in self.subscribers:
+            subscriber.put_nowait(message)
+
+
+# bool là lớp con của int nhưng true/false trong JSON không phải là số
+def _is_integer(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def parse_job(spec):
+    """
+    Kiểm tra yêu cầu (dict JSON) và trả về các tham số của Job; lỗi được báo bằng ValueError.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("request body must be a JSON object")
+    board = spec.get('board')
+    if not isinstance(board, list) or not all(_is_integer(tile) for tile in board):
+        raise ValueError("board must be a list of integers (row by row, 0 is the blank)")
+    size = spec.get('size')
+    if size is None:
+        size = math.isqrt(len(board))
+    elif not _is_integer(size):
+        raise ValueError("size must be an integer")
+    if size < 2 or size * size != len(board) or sorted(board) != list(range(size * size)):
+        raise ValueError("board must be a permutation of 0..n*n-1")
+    if not generator.is_solvable_batch([board], size)[0]:
+        raise ValueError("board is not solvable")
+    algorithm = spec.get('algorithm', 'idastar')
+    if not isinstance(algorithm, str) or algorithm not in npuzzle.SOLVERS or algorithm in ('portfolio', 'pidastar'):
+        raise ValueError(f"unknown or unsupported algorithm {algorithm!r}")
+    heuristic = spec.get('heuristic')
+    if heuristic is not None and (not isinstance(heuristic, str) or heuristic not in npuzzle.HEURISTICS):
+        raise ValueError(f"unknown heuristic {heuristic!r}, choose from {', '.join(npuzzle.HEURISTICS)}")
+    max_depth = spec.get('max_depth', 80)
+    priority = spec.get('priority') or 0
+    time_budget = spec.get('time_budget')
+    node_budget = spec.get('node_budget')
+    memory_budget = spec.get('memory_budget')
+    if not _is_integer(max_depth):
+        raise ValueError("max_depth must be an integer")
+    for name, value in (('priority', priority), ('time_budget', time_budget), ('node_budget', node_budget),
+                        ('memory_budget', memory_budget)):
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"{name} must be a number")
+    return board, size, algorithm, max_depth, priority, time_budget, node_budget, memory_budget, heuristic
+
+
+class SolverService:
+    """
+    Dịch vụ giải bài toán: hàng đợi ưu tiên (priority lớn hơn được giải trước, cùng mức thì theo thứ
+    tự gửi) và một nhóm tiến trình giải được khởi tạo sẵn (đã nạp bảng), mỗi tiến trình giải một công
+    việc một lúc. Công việc có thể bị huỷ và có giới hạn thời gian/số nút/bộ nhớ riêng (npuzzle.SearchLimits),
+    mỗi tiến trình giải có một npuzzle.CancellationToken để huỷ công việc đang chạy.
+    """
+    def __init__(self, workers=None, pdb=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pdb = pdb
+        self.jobs = OrderedDict()
+        self.ids = itertools.count(1)
+        self.results = _mp.Queue()
+        self.tokens = [npuzzle.CancellationToken(_mp) for _ in range(self.workers)]
+        self.processes = [None] * self.workers
+        self.tasks = [None] * self.workers
+        self.running = {}
+        self.loops = []
+
+    async def start(self):
+        self.pending = asyncio.PriorityQueue()
+        self.idle = asyncio.Queue()
+        for index in range(self.workers):
+            self._spawn(index)
+        loop = asyncio.get_running_loop()
+        self.loops = [loop.create_task(self._read_results()), loop.create_task(self._dispatch()),
+                      loop.create_task(self._watchdog())]
+
+    def _spawn(self, index):
+        # Tiến trình mới báo 'ready' khi đã nạp xong bảng, lúc đó mới được nhận việc
+        self.tasks[index] = _mp.Queue()
+        self.processes[index] = _mp.Process(target=_worker, daemon=True,
+                                            args=(index, self.tasks[index], self.results, self.tokens[index], self.pdb))
+        self.processes[index].start()
+
+    def _restart(self, index):
+        self.processes[index].terminate()
+        self.processes[index].join()
+        self.running.pop(index, None)
+        self._spawn(index)
+
+    async def stop(self):
+        for task in self.loops:
+            task.cancel()
+        for index in range(self.workers):
+            self.tasks[index].put(None)
+        for process in self.processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+        # Đánh thức luồng đang chờ results.get() trong _read_results
+        self.results.put(None)
+
+    def submit(self, spec):
+        params = parse_job(spec)
+        job = Job(next(self.ids), *params)
+        self.jobs[job.id] = job
+        self.pending.put_nowait((-job.priority, job.id, job))
+        return job
+
+    def cancel(self, job):
+        if job.status == 'queued':
+            self._finish(job, {'status': 'cancelled', 'solution': None, 'nodes': 0, 'elapsed': 0.0,
+                               'depth': None, 'bound': None, 'error': None})
+        elif job.status == 'running':
+            # Giải thuật sẽ dừng ở lần kiểm tra giới hạn kế tiếp
+            self.tokens[job.worker].cancel()
+            job.cancel_requested = time()
+
+    def _finish(self, job, result):
+        job.status = result['status']
+        job.result = result
+        job.publish({'type': 'result', 'id': job.id, **result})
+        for subscriber in job.subscribers:
+            subscriber.put_nowait(None)
+        # Chỉ giữ MAX_FINISHED công việc đã xong gần nhất
+        finished = [job_id for job_id, other in self.jobs.items() if other.status in FINAL_STATUSES]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED)]:
+            del self.jobs[job_id]
+
+    async def _dispatch(self):
+        while True:
+            index = await self.idle.get()
+            while True:
+                _, _, job = await self.pending.get()
+                if job.status == 'queued':
+                    break
+            job.status = 'running'
+            job.worker = index
+            job.started = time()
+            self.tokens[index].reset()
+            self.running[index] = job
+            self.tasks[index].put(job.task())
+
+    async def _read_results(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(None, self.results.get)
+            if message is None:
+                break
+            # (loại, chỉ số tiến trình giải, id công việc, dữ liệu)
+            kind, index, job_id, payload = message
+            if kind == 'ready':
+                self.idle.put_nowait(index)
+            elif kind == 'progress':
+                job = self.jobs.get(job_id)
+                if job is not None and job.status == 'running':
+                    job.publish({'type': 'progress', 'id': job.id, **payload})
+            elif kind == 'result':
+                job = self.running.get(index)
+                # Kết quả của công việc đã bị dừng cưỡng bức (tiến trình đã khởi động lại) bị bỏ qua
+                if job is not None and job.id == job_id:
+                    del self.running[index]
+                    self._finish(job, payload)
+                    self.idle.put_nowait(index)
+
+    async def _watchdog(self):
+        while True:
+            await asyncio.sleep(WATCHDOG_INTERVAL)
+            now = time()
+            for index, job in list(self.running.items()):
+                if not self.processes[index].is_alive():
+                    status = 'failed'
+                elif job.cancel_requested is not None and now - job.cancel_requested > KILL_GRACE:
+                    status = 'cancelled'
+                elif job.time_budget is not None and now - job.started > job.time_budget + KILL_GRACE:
+                    status = 'timeout'
+                else:
+                    continue
+                self._restart(index)
+                self._finish(job, {'status': status, 'solution': None, 'nodes': None,
+                                   'elapsed': round(now - job.started, 4), 'depth': None, 'bound': None,
+                                   'error': 'solver process was stopped' if status != 'failed' else 'solver process died'})
+
+    async def events(self, job):
+        """
+        Các sự kiện của công việc (kể cả các sự kiện đã qua), kết thúc sau sự kiện kết quả.
+        """
+        subscriber = asyncio.Queue()
+        for message in job.history:
+            subscriber.put_nowait(message)
+        if job.status in FINAL_STATUSES:
+            subscriber.put_nowait(None)
+        else:
+            job.subscribers.append(subscriber)
+        try:
+            while True:
+                message = await subscriber.get()
+                if message is None:
+                    break
+                yield message
+        finally:
+            if subscriber in job.subscribers:
+                job.subscribers.remove(subscriber)
+
+    def stats(self):
+        statuses = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {'workers': self.workers, 'busy': len(self.running), 'jobs': statuses}
+
+
+# HTTP/JSON tối giản trên asyncio (một yêu cầu mỗi kết nối):
+#   POST /jobs                 gửi công việc, trả về 202 và công việc (có id)
+#   GET /jobs, GET /jobs/ID    trạng thái
+#   GET /jobs/ID/events        luồng NDJSON: các sự kiện tiến trình rồi kết quả
+#   DELETE /jobs/ID            huỷ công việc
+#   GET /stats                 số tiến trình giải và số công việc theo trạng thái
+REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+async def _respond(writer, status, body):
+    data = json.dumps(body).encode()
+    writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+    await writer.drain()
+
+async def _stream(writer, service, job):
+    # Không có Content-Length: luồng kết thúc khi đóng kết nối
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n")
+    async for message in service.events(job):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+async def handle_request(service, reader, writer):
+    try:
+        request_line = (await reader.readline()).decode().split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode().strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if len(request_line) < 2:
+            return
+        method, path = request_line[0], request_line[1].rstrip('/')
+        try:
+            length = int(headers.get('content-length', 0))
+            if length < 0:
+                raise ValueError(f"negative length {length}")
+        except ValueError as error:
+            await _respond(writer, 400, {'error': f"invalid Content-Length: {error}"})
+            return
+        body = await reader.readexactly(length)
+        parts = path.strip('/').split('/')
+
+        if parts == ['stats'] and method == 'GET':
+            await _respond(writer, 200, service.stats())
+        elif parts == ['jobs']:
+            if method == 'POST':
+                try:
+                    job = service.submit(json.loads(body or b'{}'))
+                except (ValueError, TypeError) as error:
+                    await _respond(writer, 400, {'error': str(error)})
+                    return
+                await _respond(writer, 202, job.to_dict())
+            elif method == 'GET':
+                await _respond(writer, 200, [job.to_dict() for job in service.jobs.values()])
+            else:
+                await _respond(writer, 405, {'error': f"{method} is not allowed on /jobs"})
+        elif len(parts) in (2, 3) and parts[0] == 'jobs' and parts[1].isdigit():
+            job = service.jobs.get(int(parts[1]))
+            if job is None:
+                await _respond(writer, 404, {'error': f"no job {parts[1]}"})
+            elif len(parts) == 3 and parts[2] == 'events' and method == 'GET':
+                await _stream(writer, service, job)
+            elif len(parts) == 2 and method == 'GET':
+                await _respond(writer, 200, job.to_dict())
+            elif len(parts) == 2 and method == 'DELETE':
+                service.cancel(job)
+                await _respond(writer, 200, job.to_dict())
+            else:
+                await _respond(writer, 404, {'error': f"no route {method} {path}"})
+        else:
+            await _respond(writer, 404, {'error': f"no route {method} {path}"})
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None, workers=None, pdb=None):
+    service = SolverService(workers, pdb)
+    await service.start()
+    # SIGTERM dừng dịch vụ như Ctrl-C để các tiến trình giải được dừng theo
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    handler = lambda reader, writer: handle_request(service, reader, writer)
+    if unix:
+        server = await asyncio.start_unix_server(handler, unix)
+        print(f"Solver service listening on {unix} with {service.workers} workers")
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        print(f"Solver service listening on http://{host}:{port} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+class ServiceClient:
+    """
+    Client đồng bộ cho UI và các script: gửi công việc, theo dõi sự kiện, huỷ.
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None, timeout=None):
+        self.host = host
+        self.port = port
+        self.unix = unix
+        self.timeout = timeout
+
+    def _connection(self):
+        if self.unix:
+            return UnixHTTPConnection(self.unix)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _request(self, method, path, body=None):
+        connection = self._connection()
+        try:
+            data = json.dumps(body).encode() if body is not None else None
+            connection.request(method, path, data, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            payload = json.loads(response.read())
+        finally:
+            connection.close()
+        if response.status >= 400:
+            raise ValueError(payload.get('error', response.reason))
+        return payload
+
+    def submit(self, board, algorithm='idastar', max_depth=80, priority=0, time_budget=None, node_budget=None,
+               memory_budget=None, heuristic=None):
+        return self._request('POST', '/jobs', {'board': list(board), 'algorithm': algorithm, 'max_depth': max_depth,
+                                               'priority': priority, 'time_budget': time_budget,
+                                               'node_budget': node_budget, 'memory_budget': memory_budget,
+                                               'heuristic': heuristic})['id']
+
+    def status(self, job_id):
+        return self._request('GET', f'/jobs/{job_id}')
+
+    def cancel(self, job_id):
+        return self._request('DELETE', f'/jobs/{job_id}')
+
+    def events(self, job_id):
+        connection = self._connection()
+        try:
+            connection.request('GET', f'/jobs/{job_id}/events')
+            response = connection.getresponse()
+            if response.status >= 400:
+                raise ValueError(json.loads(response.read()).get('error', response.reason))
+            for line in response:
+                yield json.loads(line)
+        finally:
+            connection.close()
+
+    def solve(self, board, **options):
+        # Gửi rồi chờ kết quả
+        job_id = self.submit(board, **options)
+        for message in self.events(job_id):
+            if message['type'] == 'result':
+                return message
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="N-Puzzle solver service")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="run the service")
+    submit_parser = subparsers.add_parser("submit", help="solve the puzzles of an input file through the service")
+    for sub in (serve_parser, submit_parser):
+        sub.add_argument("--host", default=DEFAULT_HOST)
+        sub.add_argument("--port", type=int, default=DEFAULT_PORT)
+        sub.add_argument("--unix", help="Unix socket path instead of TCP")
+    serve_parser.add_argument("-j", "--workers", type=int, help="solver processes (default: CPU count)")
+    serve_parser.add_argument("--pdb", help="pattern database file loaded by every worker")
+    submit_parser.add_argument("-i", "--input", default="input.txt")
+    submit_parser.add_argument("-a", "--algorithm", default="idastar")
+    submit_parser.add_argument("-d", "--max-depth", type=int, default=80)
+    submit_parser.add_argument("--heuristic", choices=npuzzle.HEURISTICS, help="heuristic of idastar/mbida/astar")
+    submit_parser.add_argument("--priority", type=int, default=0)
+    submit_parser.add_argument("--time-budget", type=float, help="seconds per puzzle")
+    submit_parser.add_argument("--node-budget", type=int, help="nodes per puzzle")
+    submit_parser.add_argument("--memory-budget", type=float, help="estimated search memory per puzzle (MB)")
+    submit_parser.add_argument("-v", "--verbose", action="store_true", help="print progress events")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.pdb))
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        return
+
+    client = ServiceClient(args.host, args.port, args.unix)
+    # Gửi hết rồi mới theo dõi để các tiến trình giải làm việc song song
+    job_ids = [client.submit(board, args.algorithm, args.max_depth, args.priority, args.time_budget, args.node_budget,
+                             args.memory_budget, args.heuristic)
+               for _, board in npuzzle.iter_input(args.input)]
+    for job_id in job_ids:
+        for message in client.events(job_id):
+            if message['type'] == 'progress':
+                if args.verbose:
+                    print(json.dumps(message))
+                continue
+            steps = len(message['solution']) if message['solution'] is not None else None
+            print(f"Job {job_id}: {message['status']}, steps {steps}, nodes {message['nodes']}, "
+                  f"time {message['elapsed']} second")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
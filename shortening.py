@@ -0,0 +1,289 @@
+from time import time
+import npuzzle
+
+DEFAULT_WINDOW = 12 # Số nước đi của một đoạn được tìm lại tối ưu
+WINDOW_NODES = 20000 # Số nút tối đa của một lần tìm lại; đoạn quá khó được giữ nguyên
+JUMP_RADIUS = 12 # Bán kính (số nước đi) của vùng BFS quanh mỗi mốc khi tìm đường tắt
+JUMP_NODES = 50000 # Số trạng thái tối đa của vùng quanh một mốc
+GOAL_NODES = 200000 # Số trạng thái tối đa của vùng quanh trạng thái mục tiêu (đủ cả không gian 3x3)
+# Khi người gọi không đặt limits, solve() cho việc rút ngắn tối đa TIME_RATIO lần thời gian giải (ít nhất MIN_TIME giây)
+TIME_RATIO = 4
+MIN_TIME = 1.0
+
+_CODES = {action: code for code, action in enumerate(npuzzle.ACTIONS)}
+
+
+def _move_targets(size):
+    # targets[x][nước đi] = vị trí ô trống mới
+    return [dict(moves) for moves in npuzzle.get_context(size).moves]
+
+def remove_loops(given_state, size, solution):
+    """
+    Đi lại lời giải và bỏ các vòng lặp: khi gặp lại một trạng thái đã qua, mọi nước đi giữa hai
+    lần gặp bị cắt bỏ. Trả về lời giải (dạng chuỗi như solution()) không còn trạng thái lặp.
+    """
+    context = npuzzle.get_context(size)
+    targets = _move_targets(size)
+    board = list(given_state)
+    blank = board.index(0)
+    keys = [context.pack(board)]
+    seen = {keys[0]: 0}
+    kept = []
+    for action in solution:
+        target = targets[blank][_CODES[action]]
+        board[blank], board[target] = board[target], 0
+        blank = target
+        key = context.pack(board)
+        index = seen.get(key)
+        if index is None:
+            kept.append(action)
+            seen[key] = len(keys)
+            keys.append(key)
+        else:
+            # Quay lại trạng thái thứ index: bỏ các trạng thái và nước đi sau nó
+            for later in keys[index + 1:]:
+                del seen[later]
+            del keys[index + 1:]
+            del kept[index:]
+    return kept
+
+def _distances(size):
+    # Khoảng cách Manhattan giữa hai vị trí bất kỳ
+    n = size * size
+    return [[abs(a // size - b // size) + abs(a % size - b % size) for b in range(n)] for a in range(n)]
+
+def _segment(board, blank, target, size, max_depth, targets, distances):
+    """
+    IDA* (heuristic Manhattan tới bàn cờ target bất kỳ) tìm đường đi ngắn nhất không quá max_depth
+    nước từ board tới target, dừng sau WINDOW_NODES nút. Trả về (danh sách mã nước đi hoặc None, số nút).
+    """
+    goal_of = [0] * len(target)
+    for pos, tile in enumerate(target):
+        goal_of[tile] = pos
+    h = 0
+    for pos, tile in enumerate(board):
+        if tile:
+            h += distances[pos][goal_of[tile]]
+    bound = h
+    nodes_visited = 0
+    while bound <= max_depth:
+        next_bound = None
+        # Mỗi phần tử: (bàn cờ, ô trống, h, các nước đi từ đầu đoạn)
+        stack = [(board, blank, h, ())]
+        while stack:
+            current, x, current_h, path = stack.pop()
+            nodes_visited += 1
+            if current_h == 0:
+                return list(path), nodes_visited
+            if nodes_visited > WINDOW_NODES:
+                return None, nodes_visited
+            depth = len(path)
+            last = path[-1] if path else npuzzle.NO_MOVE
+            for move, y in targets[x].items():
+                if last != npuzzle.NO_MOVE and move == npuzzle.INVERSE[last]:
+                    continue
+                tile = current[y]
+                child_h = current_h + distances[x][goal_of[tile]] - distances[y][goal_of[tile]]
+                f = depth + 1 + child_h
+                if f > bound:
+                    if next_bound is None or f < next_bound:
+                        next_bound = f
+                    continue
+                child = current.copy()
+                child[x], child[y] = tile, 0
+                stack.append((child, y, child_h, path + (move,)))
+        if next_bound is None:
+            break
+        bound = next_bound
+    return None, nodes_visited
+
+def _ball(context, start, blank, radius, max_nodes):
+    """
+    BFS từ trạng thái start (khoá nén) tới độ sâu radius, dừng khi đã gặp max_nodes trạng thái
+    (tầng cuối khi đó chỉ có một phần). Trả về (parents: khoá -> (khoá cha, mã nước đi), None ở start; levels[d]: các khoá
+    ở khoảng cách d).
+    """
+    bits = context.bits
+    mask = context.mask
+    moves = context.moves
+    parents = {start: None}
+    levels = [[start]]
+    frontier = [(start, blank)]
+    while frontier and len(levels) <= radius and len(parents) < max_nodes:
+        next_frontier = []
+        for key, x in frontier:
+            for move, y in moves[x]:
+                tile = (key >> (y * bits)) & mask
+                child = key - (tile << (y * bits)) + (tile << (x * bits))
+                if child not in parents:
+                    parents[child] = (key, move)
+                    next_frontier.append((child, y))
+            if len(parents) >= max_nodes:
+                break
+        frontier = next_frontier
+        if frontier:
+            levels.append([key for key, _ in frontier])
+    return parents, levels
+
+def _moves_to(parents, key):
+    # Các mã nước đi từ gốc của vùng BFS tới key
+    codes = []
+    while parents[key] is not None:
+        key, move = parents[key]
+        codes.append(move)
+    codes.reverse()
+    return codes
+
+def _moves_from(parents, key):
+    # Các mã nước đi từ key về gốc của vùng BFS (đi ngược từng nước)
+    codes = []
+    while parents[key] is not None:
+        key, move = parents[key]
+        codes.append(npuzzle.INVERSE[move])
+    return codes
+
+def goal_ball(size, radius, max_nodes=GOAL_NODES):
+    """
+    Vùng BFS quanh trạng thái mục tiêu, dùng chung cho mọi lượt shorten_jumps của cùng lời giải.
+    Chỉ trạng thái cách đích ít hơn độ dài lời giải mới rút ngắn được nó, nên radius là độ dài đó trừ 1.
+    """
+    context = npuzzle.get_context(size)
+    return _ball(context, context.goal_packed, context.goal.index(0), radius, max_nodes)
+
+def shorten_jumps(given_state, size, solution, radius=JUMP_RADIUS, limits=None, goal=None):
+    """
+    Tìm đường tắt giữa các trạng thái cách xa nhau trên lời giải nhưng gần nhau trên bàn cờ: từ mỗi
+    mốc (bắt đầu từ trạng thái đầu), duyệt BFS vùng bán kính radius quanh mốc, nhảy tới trạng thái
+    của lời giải trong vùng đó cho số nước tiết kiệm lớn nhất rồi lấy trạng thái đó làm mốc kế tiếp;
+    nếu không có đường tắt, mốc kế tiếp cách mốc này nửa bán kính.
+    Các trạng thái trong vùng quanh mục tiêu (goal, xem goal_ball) được coi như nằm cách đích đúng
+    khoảng cách BFS của chúng: vùng quanh mốc chạm vùng quanh mục tiêu thì nối thẳng tới đích, nên
+    hai vùng cùng tìm được đường ngắn nhất dài tới radius + bán kính vùng quanh mục tiêu.
+    limits (npuzzle.SearchLimits) được kiểm tra giữa các mốc, sau mốc đầu tiên: đường tắt từ trạng thái
+    đầu thường tiết kiệm nhiều nhất, kể cả khi limits đã hết trong lúc dựng vùng quanh mục tiêu.
+    Lời giải vào không được có trạng thái lặp (remove_loops).
+    Trả về (lời giải, số trạng thái đã duyệt, lý do dừng hoặc None).
+    """
+    context = npuzzle.get_context(size)
+    targets = _move_targets(size)
+    codes = [_CODES[action] for action in solution]
+    board = list(given_state)
+    blank = board.index(0)
+    keys = [context.pack(board)]
+    blanks = [blank]
+    for code in codes:
+        target = targets[blank][code]
+        board[blank], board[target] = board[target], 0
+        blank = target
+        keys.append(context.pack(board))
+        blanks.append(blank)
+    # Vị trí (thật hoặc quy đổi) của mỗi trạng thái đích có thể nhảy tới
+    positions = {key: index for index, key in enumerate(keys)}
+    goal_parents, goal_levels = goal if goal is not None else goal_ball(size, len(codes) - 1, GOAL_NODES)
+    nodes_visited = len(goal_parents) if goal is None else 0
+    through_goal = set()
+    for distance, level in enumerate(goal_levels):
+        for key in level:
+            if positions.get(key, -1) < len(codes) - distance:
+                positions[key] = len(codes) - distance
+                through_goal.add(key)
+
+    step = max(1, radius // 2)
+    shortened = []
+    i = 0
+    while i < len(codes):
+        if limits is not None and i > 0:
+            status = limits.check(nodes_visited)
+            if status is not None:
+                return [npuzzle.ACTIONS[code] for code in shortened + codes[i:]], nodes_visited, status
+        parents, levels = _ball(context, keys[i], blanks[i], radius, JUMP_NODES)
+        nodes_visited += len(parents)
+        best, best_gain = None, 0
+        for distance, level in enumerate(levels):
+            for key in level:
+                gain = positions.get(key, -1) - i - distance
+                if gain > best_gain:
+                    best, best_gain = key, gain
+        if best is None:
+            # Vùng quanh mốc kế bên gần như trùng vùng này (mọi trạng thái cách mốc i + 1 không quá
+            # radius - 1 nước đều cách mốc i không quá radius nước) nên bỏ qua nửa bán kính
+            shortened.extend(codes[i:i + step])
+            i += step
+        elif best in through_goal:
+            shortened.extend(_moves_to(parents, best) + _moves_from(goal_parents, best))
+            break
+        else:
+            shortened.extend(_moves_to(parents, best))
+            i = positions[best]
+    return [npuzzle.ACTIONS[code] for code in shortened], nodes_visited, None
+
+def shorten_windows(given_state, size, solution, window=DEFAULT_WINDOW, limits=None):
+    """
+    Quét lời giải theo các cửa sổ window nước đi: với mỗi đoạn, tìm lại đường đi ngắn nhất giữa
+    trạng thái đầu và cuối đoạn (giới hạn độ sâu là độ dài đoạn - 1, nên chỉ tìm thấy khi có đường
+    ngắn hơn) và thay đoạn đó nếu tìm thấy. Quét lại cho tới khi một lượt không rút ngắn được gì.
+    limits (npuzzle.SearchLimits) được kiểm tra giữa các cửa sổ.
+    Trả về (lời giải, số nút đã duyệt, lý do dừng hoặc None).
+    """
+    targets = _move_targets(size)
+    distances = _distances(size)
+    codes = [_CODES[action] for action in solution]
+    step = max(1, window // 2)
+    nodes_visited = 0
+    improved = True
+    while improved:
+        improved = False
+        board = list(given_state)
+        blank = board.index(0)
+        i = 0
+        while i + 1 < len(codes):
+            if limits is not None:
+                status = limits.check(nodes_visited)
+                if status is not None:
+                    return [npuzzle.ACTIONS[code] for code in codes], nodes_visited, status
+            j = min(i + window, len(codes))
+            end = board.copy()
+            x = blank
+            for code in codes[i:j]:
+                y = targets[x][code]
+                end[x], end[y] = end[y], 0
+                x = y
+            segment, nodes = _segment(board, blank, end, size, j - i - 1, targets, distances)
+            nodes_visited += nodes
+            if segment is not None:
+                # Đoạn mới ngắn hơn: thử tiếp từ cùng vị trí với cửa sổ kéo dài thêm
+                codes[i:j] = segment
+                improved = True
+                continue
+            for code in codes[i:i + step]:
+                y = targets[blank][code]
+                board[blank], board[y] = board[y], 0
+                blank = y
+            i += step
+    return [npuzzle.ACTIONS[code] for code in codes], nodes_visited, None
+
+def shorten_solution(given_state, size, solution, window=DEFAULT_WINDOW, limits=None):
+    """
+    Rút ngắn lời giải của một giải thuật bất kỳ: bỏ vòng lặp, rồi lặp lại việc tìm đường tắt giữa
+    các trạng thái xa nhau (shorten_jumps) và tìm lại tối ưu từng đoạn ngắn (shorten_windows) cho
+    tới khi một lượt không rút ngắn được gì. Lời giải trả về luôn hợp lệ, kể cả khi dừng giữa chừng vì limits.
+    Trả về (lời giải, thống kê: độ dài trước, sau khi bỏ vòng lặp, sau cùng, số nút, thời gian, lý do dừng).
+    """
+    start_time = time()
+    without_loops = remove_loops(given_state, size, solution)
+    shortened = without_loops
+    goal = goal_ball(size, len(without_loops) - 1, GOAL_NODES)
+    nodes_visited = len(goal[0])
+    status = None
+    while status is None:
+        length = len(shortened)
+        shortened, nodes, status = shorten_jumps(given_state, size, shortened, JUMP_RADIUS, limits, goal)
+        nodes_visited += nodes
+        if status is None:
+            shortened, nodes, status = shorten_windows(given_state, size, shortened, window, limits)
+            nodes_visited += nodes
+        shortened = remove_loops(given_state, size, shortened)
+        if len(shortened) >= length:
+            break
+    return shortened, {'before': len(solution), 'after_loops': len(without_loops), 'after': len(shortened),
+                       'nodes': nodes_visited, 'elapsed': time() - start_time, 'stopped': status}
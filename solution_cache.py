@@ -0,0 +1,120 @@
+import sqlite3
+from collections import OrderedDict
+import npuzzle
+
+# Phép đối xứng qua đường chéo chính đổi hướng trái <-> lên, phải <-> xuống
+_TRANSPOSED_ACTION = {'Left': 'Up', 'Up': 'Left', 'Right': 'Down', 'Down': 'Right'}
+_CODE = {'Left': 'L', 'Right': 'R', 'Up': 'U', 'Down': 'D'}
+_ACTION = {code: action for action, code in _CODE.items()}
+
+def transpose_board(board, size):
+    """
+    Lật bàn cờ qua đường chéo chính và đánh số lại các ô để trạng thái mục tiêu vẫn là
+    [1, 2, ..., 0]: ô có vị trí đích (r, c) trở thành ô có vị trí đích (c, r).
+    """
+    transposed = [0] * (size * size)
+    for pos, tile in enumerate(board):
+        row, col = divmod(pos, size)
+        if tile:
+            goal_row, goal_col = divmod(tile - 1, size)
+            tile = goal_col * size + goal_row + 1
+        transposed[col * size + row] = tile
+    return transposed
+
+def transpose_moves(moves):
+    return [_TRANSPOSED_ACTION[move] for move in moves]
+
+# Dạng chuẩn của bàn cờ: khoá nhỏ hơn giữa bàn cờ và bản lật của nó
+def canonical(board, size):
+    context = npuzzle.get_context(size)
+    key = context.pack(board)
+    transposed_key = context.pack(transpose_board(board, size))
+    if transposed_key < key:
+        return transposed_key, True
+    return key, False
+
+
+class SolutionCache:
+    """
+    Bộ nhớ đệm lời giải đặt trước các giải thuật: lưu trong bộ nhớ với chính sách LRU, có thể
+    kèm một file SQLite để giữ lại lời giải giữa các lần chạy. Hai bàn cờ đối xứng qua đường
+    chéo chính dùng chung một mục, lời giải được lật lại khi tra cứu.
+    variant là chuỗi mô tả các tuỳ chọn làm thay đổi lời giải (ví dụ trọng số của reduce), được
+    thêm vào khoá; lời giải dài hơn max_length khi tra cứu được coi như không có.
+    """
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, timeout=30)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, moves TEXT NOT NULL)")
+            self.db.commit()
+
+    @staticmethod
+    def _key(algorithm, variant, size, packed):
+        name = f"{algorithm}[{variant}]" if variant else algorithm
+        return f"{name}:{size}:{packed}"
+
+    def get(self, algorithm, board, size, variant='', max_length=None):
+        packed, transposed = canonical(board, size)
+        key = self._key(algorithm, variant, size, packed)
+        moves = self.entries.get(key)
+        if moves is not None:
+            self.entries.move_to_end(key)
+            source = 'memory'
+        elif self.db is not None:
+            row = self.db.execute("SELECT moves FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                moves = row[0]
+                self._remember(key, moves)
+                source = 'disk'
+        # Lời giải đã lưu dài hơn giới hạn độ sâu của lần gọi này thì không dùng được
+        if moves is not None and max_length is not None and len(moves) > max_length:
+            moves = None
+        if moves is not None:
+            if source == 'memory':
+                self.hits += 1
+            else:
+                self.disk_hits += 1
+        else:
+            self.misses += 1
+            return None
+        solution = [_ACTION[code] for code in moves]
+        return transpose_moves(solution) if transposed else solution
+
+    def put(self, algorithm, board, size, solution, variant=''):
+        packed, transposed = canonical(board, size)
+        key = self._key(algorithm, variant, size, packed)
+        if transposed:
+            solution = transpose_moves(solution)
+        moves = ''.join(_CODE[move] for move in solution)
+        self._remember(key, moves)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO solutions (key, moves) VALUES (?, ?)", (key, moves))
+            self.db.commit()
+
+    def _remember(self, key, moves):
+        self.entries[key] = moves
+        self.entries.move_to_end(key)
+        # Loại mục ít được dùng gần đây nhất khi vượt quá kích thước
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+        }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
@@ -1,14 +1,6 @@
 import numpy as np
 import random
-
-def count_inversions(arr):
-    inversions = 0
-    flattened = [num for num in arr if num != 0]  # Bỏ ô trống
-    for i in range(len(flattened)):
-        for j in range(i + 1, len(flattened)):
-            if flattened[i] > flattened[j]:
-                inversions += 1
-    return inversions
+from generator import count_inversions  # Đếm số cặp đảo vị bằng cây Fenwick, O(n log n)
 
 def is_solvable(puzzle, k):
     inversions = count_inversions(puzzle.flatten())
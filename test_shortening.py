@@ -0,0 +1,88 @@
+import npuzzle
+import shortening
+
+# Bàn cờ 3x3 khó nhất (31 nước) và bàn cờ 4x4 cách đích 2 nước: lời giải DFS dài hàng nghìn nước
+
+# Một vòng ngược chiều kim đồng hồ của ô trống quanh ô vuông 2x2 (ô trống ở góc trên trái): ba vòng
+# trả lại bàn cờ ban đầu, nên hai vòng (8 nước) đến cùng trạng thái với một vòng theo chiều ngược lại (4 nước)
+_ROUND = ['Down', 'Right', 'Up', 'Left']
+
+def _replay(board, size, solution):
+    targets = shortening._move_targets(size)
+    board = list(board)
+    blank = board.index(0)
+    for action in solution:
+        target = targets[blank][shortening._CODES[action]]
+        board[blank], board[target] = board[target], 0
+        blank = target
+    return board
+
+def _check_near_optimal(board, size, slack):
+    solution = npuzzle.DFS(board, size, npuzzle.PackedState).solution
+    optimal = len(npuzzle.IDA_star(board, size).solution)
+    shortened, stats = shortening.shorten_solution(board, size, solution)
+    assert _replay(board, size, shortened) == npuzzle.get_context(size).goal
+    assert stats['before'] == len(solution) and stats['after'] == len(shortened)
+    assert len(shortened) <= optimal + slack, (len(solution), len(shortened), optimal)
+
+def _detour_4x4():
+    # Bàn cờ 4x4 cách đích 20 nước, ô trống ở vị trí 5; trả về (bàn cờ đầu, lời giải có đường vòng 8 nước,
+    # độ dài khi thay đường vòng bằng 4 nước)
+    board = [1, 6, 2, 3, 5, 0, 8, 7, 12, 10, 11, 4, 9, 13, 14, 15]
+    optimal = npuzzle.IDA_star(board, 4).solution
+    start = _replay(board, 4, _ROUND)
+    return start, 2 * _ROUND + optimal, len(optimal) + 4
+
+def test_dfs_path_3x3_is_shortened_to_optimal():
+    _check_near_optimal([8, 6, 7, 2, 5, 4, 3, 0, 1], 3, 0)
+
+def test_dfs_path_4x4_is_shortened_to_optimal():
+    _check_near_optimal([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 0, 11, 13, 14, 15, 12], 4, 0)
+
+def test_solve_shortens_cached_solutions():
+    import solution_cache
+    cache = solution_cache.SolutionCache(16)
+    board = [8, 6, 7, 2, 5, 4, 3, 0, 1]
+    raw = npuzzle.solve(board, 3, 'dfs', cache=cache)
+    shortened = npuzzle.solve(board, 3, 'dfs', cache=cache, shorten=True)
+    assert shortened.original_length == len(raw.solution)
+    assert len(shortened.solution) == 31
+    # Cache vẫn giữ lời giải gốc của DFS
+    assert npuzzle.solve(board, 3, 'dfs', cache=cache).solution == raw.solution
+
+def test_limits_keep_the_solution_valid():
+    board = [8, 6, 7, 2, 5, 4, 3, 0, 1]
+    solution = npuzzle.DFS(board, 3, npuzzle.PackedState).solution
+    token = npuzzle.CancellationToken()
+    token.cancel()
+    shortened, stats = shortening.shorten_solution(board, 3, solution, limits=npuzzle.SearchLimits(token=token))
+    assert stats['stopped'] == 'cancelled'
+    assert _replay(board, 3, shortened) == npuzzle.get_context(3).goal
+
+def test_windows_shorten_a_detour_4x4(monkeypatch):
+    # Vùng quanh mục tiêu và quanh các mốc chỉ còn một trạng thái: chỉ bước tìm lại theo cửa sổ rút ngắn được
+    monkeypatch.setattr(shortening, 'GOAL_NODES', 1)
+    monkeypatch.setattr(shortening, 'JUMP_NODES', 1)
+    start, detour, shortest = _detour_4x4()
+    shortened, stats = shortening.shorten_solution(start, 4, detour)
+    assert stats['after_loops'] == len(detour)
+    assert _replay(start, 4, shortened) == npuzzle.get_context(4).goal
+    assert len(shortened) <= shortest
+
+def test_jumps_shorten_a_detour_without_goal_ball(monkeypatch):
+    monkeypatch.setattr(shortening, 'GOAL_NODES', 1)
+    start, detour, shortest = _detour_4x4()
+    shortened, _, status = shortening.shorten_jumps(start, 4, detour)
+    assert status is None
+    assert _replay(start, 4, shortened) == npuzzle.get_context(4).goal
+    assert len(shortened) <= shortest
+
+def test_solve_limits_shortening_by_solve_time(monkeypatch):
+    # Không có limits: thời gian rút ngắn theo thời gian giải, ở đây hết ngay sau mốc đầu tiên
+    monkeypatch.setattr(shortening, 'MIN_TIME', 0.0)
+    monkeypatch.setattr(shortening, 'TIME_RATIO', 0)
+    board = [8, 6, 7, 2, 5, 4, 3, 0, 1]
+    result = npuzzle.solve(board, 3, 'dfs', shorten=True)
+    assert _replay(board, 3, result.solution) == npuzzle.get_context(3).goal
+    # Vùng quanh mục tiêu phủ cả không gian 3x3 nên mốc đầu tiên đã nhảy thẳng tới đích
+    assert len(result.solution) == 31
@@ -0,0 +1,162 @@
+import numpy as np
+from time import time
+import npuzzle
+
+def _move_tables(context):
+    """
+    Bảng dạng mảng cho từng nước đi: legal[m][x] cho biết ô trống ở x có đi được theo m không,
+    target[m][x] là vị trí ô trống mới.
+    """
+    legal = np.zeros((4, context.n), dtype=bool)
+    target = np.zeros((4, context.n), dtype=np.int64)
+    for x, moves in enumerate(context.moves):
+        for move, new_blank in moves:
+            legal[move, x] = True
+            target[move, x] = new_blank
+    return legal, target
+
+# Số bàn cờ của tầng hiện tại được mở rộng trong một khối; limits được kiểm tra sau mỗi khối
+BLOCK = 1 << 18
+# Số nhóm giá trị chia tầng mới khi loại trùng, để mỗi lần gọi NumPy chỉ xử lý một phần của tầng
+BUCKETS = 64
+
+def _expand(boards, blanks, offset, legal, target, bits, mask):
+    """
+    Áp dụng mọi nước đi hợp lệ cho một khối bàn cờ. Trả về các bàn cờ con đã loại trùng và sắp xếp,
+    cùng vị trí ô trống, chỉ số nút cha (cộng offset của khối trong tầng) và mã nước đi.
+    """
+    children, child_blanks, parents, moves = [], [], [], []
+    for move in range(4):
+        index = np.nonzero(legal[move, blanks])[0]
+        if len(index) == 0:
+            continue
+        board = boards[index]
+        x = blanks[index]
+        t = target[move, x]
+        tile = (board >> (t.astype(np.uint64) * bits)) & mask
+        # Đưa ô số ở vị trí t vào vị trí ô trống x (nhóm bit của ô trống đang bằng 0)
+        children.append(board - (tile << (t.astype(np.uint64) * bits)) + (tile << (x.astype(np.uint64) * bits)))
+        child_blanks.append(t)
+        parents.append(index + offset)
+        moves.append(np.full(len(index), move, dtype=np.int8))
+    return _unique(children, child_blanks, parents, moves)
+
+# Ghép các phần rồi loại trùng; np.unique trả về mảng đã sắp xếp
+def _unique(children, child_blanks, parents, moves):
+    children, first = np.unique(np.concatenate(children), return_index=True)
+    return (children, np.concatenate(child_blanks)[first], np.concatenate(parents)[first],
+            np.concatenate(moves)[first])
+
+# Giải thuật BFS theo từng tầng: mỗi tầng là một mảng các bàn cờ đã nén, áp dụng nước đi cho cả mảng cùng lúc
+def BFS(given_state, size, max_depth=80, progress=None, limits=None):
+    """
+    Tầng hiện tại được mở rộng theo từng khối BLOCK bàn cờ; các bàn cờ con được chia thành BUCKETS
+    nhóm theo giá trị (mốc chia lấy từ tầng hiện tại đã sắp xếp) và mỗi nhóm được loại trùng riêng,
+    nối các nhóm theo thứ tự cho tầng mới đã sắp xếp. limits được kiểm tra sau mỗi khối và mỗi nhóm,
+    bộ nhớ của tầng mới được ước lượng trước khi mở rộng, node_limit được so sánh chính xác.
+    """
+    start_time = time()
+    context = npuzzle.get_context(size)
+    # Mỗi ô chiếm 4 bit, bàn cờ phải vừa trong một số uint64
+    if context.bits * context.n > 64:
+        raise ValueError(f"{size}x{size} boards do not fit in 64 bits, use size <= 4")
+    legal, target = _move_tables(context)
+    branching = legal.sum(axis=0)
+    bits = np.uint64(context.bits)
+    mask = np.uint64(context.mask)
+    goal = np.uint64(context.goal_packed)
+
+    boards = np.array([context.pack(given_state)], dtype=np.uint64)
+    blanks = np.array([given_state.index(0)], dtype=np.int64)
+    if boards[0] == goal:
+        return npuzzle.SearchResult([], 0, elapsed=time() - start_time)
+
+    # Mỗi tầng lưu các bàn cờ đã sắp xếp, chỉ số nút cha ở tầng trước và mã nước đi
+    levels = [(boards, np.array([-1]), np.array([-1], dtype=np.int8))]
+    previous = np.empty(0, dtype=np.uint64)
+    nodes_visited = 0
+    node_limit = None if limits is None else limits.node_limit
+
+    def stopped(status, depth):
+        return npuzzle.SearchResult(None, nodes_visited, status, time() - start_time, depth)
+
+    for depth in range(max_depth):
+        stored = sum(len(level[0]) for level in levels)
+        if progress is not None:
+            progress.report(nodes_visited, depth, None, len(boards), stored)
+        if limits is not None:
+            # Ước lượng tầng mới trước khi cấp phát: mỗi bàn cờ (trừ gốc) có một nước đi quay về tầng trước
+            estimate = int(branching[blanks].sum()) - (len(boards) if depth else 0)
+            status = limits.check(nodes_visited, estimate, stored)
+            if status is not None:
+                return stopped(status, depth)
+
+        splitters = boards[np.arange(1, BUCKETS) * len(boards) // BUCKETS] if len(boards) > BLOCK else boards[:0]
+        buckets = [[] for _ in range(len(splitters) + 1)]
+        generated = 0
+        for start in range(0, len(boards), BLOCK):
+            stop = min(start + BLOCK, len(boards))
+            if node_limit is not None:
+                if nodes_visited >= node_limit:
+                    return stopped('budget', depth)
+                stop = min(stop, start + node_limit - nodes_visited)
+            block = _expand(boards[start:stop], blanks[start:stop], start, legal, target, bits, mask)
+            nodes_visited += stop - start
+            generated += len(block[0])
+            cuts = [0, *np.searchsorted(block[0], splitters), len(block[0])]
+            for bucket, low, high in zip(buckets, cuts, cuts[1:]):
+                bucket.append(tuple(array[low:high] for array in block))
+            if limits is not None:
+                status = limits.check(nodes_visited, generated, stored)
+                if status is not None:
+                    return stopped(status, depth)
+        if not generated:
+            break
+
+        parts = []
+        for bucket in buckets:
+            children, child_blanks, parents, moves = _unique(*zip(*bucket))
+            # Đồ thị trạng thái là đồ thị hai phía nên chỉ cần loại các trạng thái thuộc tầng trước tầng hiện tại
+            if len(previous):
+                position = np.minimum(np.searchsorted(previous, children), len(previous) - 1)
+                fresh = previous[position] != children
+                children, child_blanks, parents, moves = (children[fresh], child_blanks[fresh],
+                                                          parents[fresh], moves[fresh])
+            parts.append((children, child_blanks, parents, moves))
+            if limits is not None:
+                status = limits.check(nodes_visited, generated, stored)
+                if status is not None:
+                    return stopped(status, depth)
+        # Các nhóm nối tiếp nhau theo giá trị nên tầng mới vẫn được sắp xếp
+        children, child_blanks, parents, moves = (np.concatenate(arrays) for arrays in zip(*parts))
+
+        levels.append((children, parents, moves))
+        found = np.searchsorted(children, goal)
+        if found < len(children) and children[found] == goal:
+            # Dựng lại lời giải từ mảng cha của từng tầng
+            solution = []
+            index = found
+            for level in range(len(levels) - 1, 0, -1):
+                _, level_parents, level_moves = levels[level]
+                solution.append(npuzzle.ACTIONS[level_moves[index]])
+                index = level_parents[index]
+            solution.reverse()
+            return npuzzle.SearchResult(solution, nodes_visited, elapsed=time() - start_time)
+
+        # Các tầng đều đã được sắp xếp nên dùng trực tiếp cho searchsorted
+        previous = boards
+        boards = children
+        blanks = child_blanks
+
+    return npuzzle.SearchResult(None, nodes_visited, elapsed=time() - start_time, bound=max_depth)
+
+def BFS_with_steps(given_state, size, max_depth, solution_queue, limits=None):
+    """
+    Giải thuật BFS (NumPy) nhưng gửi các bước di chuyển qua Queue khi tìm thấy lời giải.
+    """
+    start_time = time()
+    result = BFS(given_state, size, max_depth, limits=limits)
+    solution, nodes_visited = result
+    elapsed_time = time() - start_time
+    npuzzle.put_solution(solution_queue, solution, elapsed_time, nodes_visited, result.status)
+    return elapsed_time, nodes_visited, len(solution) if solution is not None else 0
@@ -0,0 +1,141 @@
+import math
+import npuzzle
+
+# Các tập trạng thái đã duyệt dùng chung một giao diện: add(key), key in visited, len(visited), memory_bytes().
+# key là khoá nén của nút (node.key()), nên hai trạng thái khác nhau không bao giờ bị coi là một
+# (trừ BloomFilter, là tập xấp xỉ).
+
+class PackedSet:
+    """
+    Tập chính xác các khoá nén (số nguyên).
+    """
+    def __init__(self):
+        self.keys = set()
+
+    def add(self, key):
+        self.keys.add(key)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def memory_bytes(self):
+        # Bảng băm của set (khoảng 2 ô cho mỗi phần tử) cộng các số nguyên
+        return len(self.keys) * (2 * 16 + 36)
+
+
+def permutation_rank(board):
+    # Mã Lehmer của hoán vị: chỉ số trong 0..n!-1
+    n = len(board)
+    index = 0
+    for i in range(n - 1):
+        smaller = 0
+        tile = board[i]
+        for later in board[i + 1:]:
+            if later < tile:
+                smaller += 1
+        index = index * (n - i) + smaller
+    return index
+
+class RankBitset:
+    """
+    Tập chính xác dạng bitset, mỗi hoán vị một bit theo mã Lehmer: n! bit cho bàn cờ n ô, nên chỉ
+    dùng được cho 3x3 (45 KB cho toàn bộ không gian trạng thái). 4x4 cần 16! bit (khoảng 2,6 TB) và
+    xếp hạng theo một phần bàn cờ (như pattern_db.rank) thì không còn chính xác, nên bàn cờ lớn hơn
+    MAX_BITS bị từ chối: dùng PackedSet hoặc BloomFilter.
+    """
+    MAX_BITS = 1 << 33 # 1 GB
+
+    def __init__(self, size):
+        self.context = npuzzle.get_context(size)
+        bits = math.factorial(size * size)
+        if bits > self.MAX_BITS:
+            raise ValueError(f"a rank bitset for {size}x{size} boards needs {bits} bits (at most {self.MAX_BITS}, "
+                             f"enough for 3x3 only), use a packed set or a Bloom filter")
+        self.bits = bytearray((bits + 7) // 8)
+        self.count = 0
+
+    def _index(self, key):
+        return permutation_rank(self.context.unpack(key))
+
+    def add(self, key):
+        index = self._index(key)
+        byte, bit = index >> 3, 1 << (index & 7)
+        if not self.bits[byte] & bit:
+            self.bits[byte] |= bit
+            self.count += 1
+
+    def __contains__(self, key):
+        index = self._index(key)
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def __len__(self):
+        return self.count
+
+    def memory_bytes(self):
+        return len(self.bits)
+
+
+class BloomFilter:
+    """
+    Tập xấp xỉ: không bao giờ bỏ sót khoá đã thêm, nhưng một khoá chưa thêm có thể bị báo là đã
+    có với xác suất khoảng error_rate khi đã thêm capacity khoá. Dùng cho tìm kiếm rất lớn khi
+    chấp nhận bỏ qua nhầm một số trạng thái (lời giải có thể dài hơn hoặc không tìm thấy).
+    """
+    def __init__(self, capacity=10_000_000, error_rate=0.01):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Băm kép: vị trí thứ i là h1 + i * h2 (mod số bit)
+        # hash() của số nguyên nhỏ là chính nó nên cần trộn bit trước khi dùng
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1 = (h * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        h2 = ((h1 >> 29) ^ (h * 0xBF58476D1CE4E5B9)) & 0xFFFFFFFFFFFFFFFF | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key):
+        new = False
+        for position in self._positions(key):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & bit:
+                self.bits[byte] |= bit
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, key):
+        for position in self._positions(key):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def memory_bytes(self):
+        return len(self.bits)
+
+
+KINDS = ('set', 'bitset', 'bloom')
+
+def make(kind, size, capacity=10_000_000, error_rate=0.01):
+    """
+    Tạo tập đã duyệt theo tên: 'set' (PackedSet), 'bitset' (RankBitset), 'bloom' (BloomFilter).
+    """
+    if kind == 'set':
+        return PackedSet()
+    if kind == 'bitset':
+        return RankBitset(size)
+    if kind == 'bloom':
+        return BloomFilter(capacity, error_rate)
+    raise ValueError(f"unknown visited set {kind!r}, choose from {', '.join(KINDS)}")
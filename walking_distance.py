@@ -0,0 +1,214 @@
+import os
+import sys
+import mmap
+import struct
+import argparse
+from time import time
+from array import array
+import npuzzle
+
+# Định dạng file bảng: header cố định, khoảng cách của từng trạng thái (1 byte), bảng chuyển trạng thái
+# (int32, xem build_table) rồi các trạng thái (size * size + 1 byte) để tra chỉ số của nút gốc
+MAGIC = b'NPWD'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHBI')   # magic, version, size, số trạng thái
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+# Kích thước lớn nhất có bảng: đồ thị 4x4 có 24964 trạng thái, 5x5 đã có 65650495 (khoảng 3 GB
+# cho bảng chuyển trạng thái) nên không dùng được
+MAX_SIZE = 4
+
+
+class WalkingDistance:
+    """
+    Heuristic walking distance (chấp nhận được, không nhỏ hơn Manhattan). Theo chiều dọc, bàn cờ được
+    thu gọn thành ma trận m[r][g] = số ô đang ở hàng r có hàng đích g, cùng hàng của ô trống; mỗi nước
+    đi dọc chuyển một ô giữa hai hàng kề nhau. Khoảng cách BFS trên đồ thị này là số nước đi dọc tối
+    thiểu; chiều ngang tương tự với cột, và vì mục tiêu đối xứng nên dùng chung một bảng.
+    Chỉ số trạng thái hàng/cột của mỗi nút được giữ trong node.hdata và cập nhật bằng một lần tra
+    bảng chuyển trạng thái mỗi nước đi. Dùng được như heuristic của IDA_star/memory_bounded_IDA_star/A_star.
+    """
+    def __init__(self, size, distances, links, states, source=None, path=None):
+        self.size = size
+        self.path = path # File đã nạp (để tiến trình khác có thể tự ánh xạ lại cùng bảng)
+        self.distances = distances
+        self.links = links
+        self.source = source # Giữ tham chiếu tới vùng nhớ mmap (nếu có)
+        record = size * size + 1
+        self.index = {bytes(states[i * record:(i + 1) * record]): i for i in range(len(distances))}
+        # Hàng và cột đích của từng ô số
+        self.goal_row = [0] * (size * size)
+        self.goal_col = [0] * (size * size)
+        for tile in range(1, size * size):
+            self.goal_row[tile] = (tile - 1) // size
+            self.goal_col[tile] = (tile - 1) % size
+
+    @classmethod
+    def load(cls, path):
+        # Ánh xạ file vào bộ nhớ: các tiến trình cùng đọc một file sẽ dùng chung các trang nhớ
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, count = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a walking distance table file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has table format version {version}, expected {FORMAT_VERSION}")
+        view = memoryview(buffer)
+        offset = HEADER.size
+        distances = view[offset:offset + count]
+        offset += count
+        links = view[offset:offset + count * 2 * size * 4].cast('i')
+        offset += count * 2 * size * 4
+        states = view[offset:offset + count * (size * size + 1)]
+        if len(states) != count * (size * size + 1):
+            raise ValueError(f"{path} is truncated")
+        return cls(size, distances, links, states, buffer, path)
+
+    def __reduce__(self):
+        # Tiến trình con nạp lại bảng từ file thay vì nhận bản sao
+        return (WalkingDistance.load, (self.path,))
+
+    def line_state(self, board, line_of, goal_of):
+        # Chỉ số trạng thái của ma trận (dòng hiện tại, dòng đích) theo hàng hoặc cột
+        size = self.size
+        counts = [0] * (size * size + 1)
+        for pos, tile in enumerate(board):
+            if tile:
+                counts[line_of(pos) * size + goal_of[tile]] += 1
+            else:
+                counts[-1] = line_of(pos)
+        return self.index[bytes(counts)]
+
+    def evaluate(self, board):
+        size = self.size
+        row = self.line_state(board, lambda pos: pos // size, self.goal_row)
+        col = self.line_state(board, lambda pos: pos % size, self.goal_col)
+        return self.distances[row] + self.distances[col]
+
+    # Gán giá trị heuristic và chỉ số trạng thái (hàng, cột) cho nút gốc
+    def initialize(self, node):
+        size = self.size
+        board = node.state
+        row = self.line_state(board, lambda pos: pos // size, self.goal_row)
+        col = self.line_state(board, lambda pos: pos % size, self.goal_col)
+        node.hdata = (row, col)
+        node.h = self.distances[row] + self.distances[col]
+
+    # Nước đi dọc chỉ đổi trạng thái hàng, nước đi ngang chỉ đổi trạng thái cột
+    def update(self, parent, child):
+        size = self.size
+        dst = parent.blank  # Vị trí mới của ô số (ô trống cũ)
+        src = child.blank   # Vị trí cũ của ô số (ô trống mới)
+        tile = child.state[dst]
+        row, col = parent.hdata
+        # Ô trống sang dòng (hàng hoặc cột) trước khi vị trí mới nhỏ hơn vị trí cũ
+        direction = 0 if src < dst else 1
+        if src // size == dst // size:
+            col = self.links[(col * 2 + direction) * size + self.goal_col[tile]]
+        else:
+            row = self.links[(row * 2 + direction) * size + self.goal_row[tile]]
+        child.hdata = (row, col)
+        child.h = self.distances[row] + self.distances[col]
+
+
+def build_table(size):
+    """
+    BFS từ trạng thái mục tiêu trên đồ thị các ma trận (dòng hiện tại, dòng đích) cùng dòng của ô
+    trống. links[(i * 2 + d) * size + g] là trạng thái sau khi ô trống của trạng thái i sang dòng
+    trước (d = 0) hoặc dòng sau (d = 1) và ô đổi chỗ với nó có dòng đích g; -1 nếu không đi được.
+    Trả về (khoảng cách, bảng chuyển trạng thái, các trạng thái nối tiếp nhau).
+    """
+    if size > MAX_SIZE:
+        raise ValueError(f"walking distance tables are built up to {MAX_SIZE}x{MAX_SIZE} (the 5x5 graph already has "
+                         f"65650495 states), use a pattern database (pattern_db.py) for {size}x{size} boards")
+    goal = [0] * (size * size)
+    for line in range(size):
+        goal[line * size + line] = size if line < size - 1 else size - 1
+    start = tuple(goal) + (size - 1,)
+    index = {start: 0}
+    states = [start]
+    distances = bytearray([0])
+    current = 0
+    while current < len(states):
+        state = states[current]
+        blank = state[-1]
+        for neighbour in (blank - 1, blank + 1):
+            if not 0 <= neighbour < size:
+                continue
+            for g in range(size):
+                if not state[neighbour * size + g]:
+                    continue
+                # Ô có dòng đích g ở dòng kề trượt vào dòng của ô trống
+                child = list(state)
+                child[neighbour * size + g] -= 1
+                child[blank * size + g] += 1
+                child[-1] = neighbour
+                child = tuple(child)
+                if child not in index:
+                    index[child] = len(states)
+                    states.append(child)
+                    distances.append(distances[current] + 1)
+        current += 1
+
+    links = array('i', [-1]) * (len(states) * 2 * size)
+    for i, state in enumerate(states):
+        blank = state[-1]
+        for direction, neighbour in enumerate((blank - 1, blank + 1)):
+            if not 0 <= neighbour < size:
+                continue
+            for g in range(size):
+                if state[neighbour * size + g]:
+                    child = list(state)
+                    child[neighbour * size + g] -= 1
+                    child[blank * size + g] += 1
+                    child[-1] = neighbour
+                    links[(i * 2 + direction) * size + g] = index[tuple(child)]
+    return distances, links, bytes(value for state in states for value in state)
+
+def save(size, distances, links, states, path):
+    # Ghi qua file tạm rồi thay thế: các tiến trình giải (ví dụ service._warm_up) có thể cùng sinh
+    # bảng lần đầu trong khi tiến trình khác đã ánh xạ file
+    with npuzzle.replace_file(path) as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, size, len(distances)))
+        file.write(distances)
+        file.write(links.tobytes())
+        file.write(states)
+
+def default_path(size):
+    return os.path.join(TABLE_DIR, f"walking_distance_{size}x{size}.bin")
+
+_heuristics = {}
+
+def get(size, path=None):
+    """
+    Heuristic walking distance cho kích thước size, nạp khi cần lần đầu; nếu chưa có file thì sinh
+    bảng (dưới một giây cho 4x4) và ghi lại để dùng về sau.
+    """
+    path = path or default_path(size)
+    if path not in _heuristics:
+        if not os.path.exists(path):
+            save(size, *build_table(size), path)
+        _heuristics[path] = WalkingDistance.load(path)
+    return _heuristics[path]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walking distance heuristic tables for the N-Puzzle")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="generate a table file")
+    build_parser.add_argument("size", type=int)
+    build_parser.add_argument("-o", "--output")
+    info_parser = subparsers.add_parser("info", help="show statistics of a table file")
+    info_parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start_time = time()
+        path = args.output or default_path(args.size)
+        save(args.size, *build_table(args.size), path)
+        print(f"Written to {path} in {time() - start_time:.1f} second")
+    else:
+        heuristic = WalkingDistance.load(args.path)
+        print(f"Format version {FORMAT_VERSION}, size {heuristic.size}x{heuristic.size}, "
+              f"{len(heuristic.distances)} states, max distance {max(heuristic.distances)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])